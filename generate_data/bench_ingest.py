@@ -0,0 +1,145 @@
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from bulk_writer import BulkWriter, BulkPipeline, create_session
+from checkpoint import save_cache
+from fake_es import serve
+from plate_blocks import iter_blocks, render_bulk_body
+from plate_formats import FORMATS, get_format
+
+BENCH_DOCS = 200_000
+BULK_SIZE = 1000
+BENCH_BACKOFF = 0.05  # 替身返回的 429 不需要真实的退避时长
+STAGES = ("generate", "serialize", "send", "checkpoint")
+BENCH_INDEX_PREFIX = "bench_"  # 压测写入单独的索引，--es-url 指向真实集群时不会覆盖线上文档
+
+
+class StageTimer:
+    # 各阶段累计耗时；发送在多个线程里并行，累计值可能大于总耗时
+    def __init__(self):
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.lock = threading.Lock()
+
+    def wrap(self, stage, fn):
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self.lock:
+                    self.seconds[stage] += elapsed
+        return timed
+
+
+def run_case(layout, docs, concurrency, es_url, checkpoint_path):
+    timer = StageTimer()
+    body_bytes = 0
+
+    def serialize(block):
+        nonlocal body_bytes
+        body = render_bulk_body(layout, block)
+        body_bytes += len(body)
+        return body
+
+    index = f"{BENCH_INDEX_PREFIX}{layout.name}"
+    session = create_session(concurrency)
+    writer = BulkWriter(index, es_url=es_url, session=session, initial_backoff=BENCH_BACKOFF)
+    writer.send = timer.wrap("send", writer.send)
+    # 从键空间中部开始，避开全 A 前缀这种过于规整的数据
+    start = layout.size // 2
+    blocks = iter_blocks(layout, start, start + docs, BULK_SIZE)
+    next_block = timer.wrap("generate", next)
+
+    started = time.perf_counter()
+    try:
+        with writer, BulkPipeline(
+            writer, concurrency,
+            on_checkpoint=timer.wrap("checkpoint", lambda state: save_cache(state, checkpoint_path)),
+            encoder=timer.wrap("serialize", serialize),
+        ) as pipeline:
+            while True:
+                block = next_block(blocks, None)
+                if block is None:
+                    break
+                pipeline.submit(block, {"ordinal": block.stop})
+        wall = time.perf_counter() - started
+    finally:
+        # 压测索引用完即删，失败时也不留下
+        with create_session() as admin_session:
+            admin_session.delete(f"{es_url}/{index}")
+
+    return {
+        "format": layout.name,
+        "concurrency": concurrency,
+        "docs": docs,
+        "seconds": round(wall, 3),
+        "docs_per_s": round(docs / wall),
+        "mb_per_s": round(body_bytes / wall / 1e6, 2),
+        **{f"{stage}_s": round(timer.seconds[stage], 3) for stage in STAGES},
+    }
+
+
+def start_fake_es(latency_ms, reject_rate, item_reject_rate):
+    # 替身服务器放在独立进程里，避免和被测代码争抢 GIL
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=serve, args=(0, latency_ms, reject_rate, item_reject_rate, ready), daemon=True,
+    )
+    process.start()
+    return process, f"http://127.0.0.1:{ready.get(timeout=10)}"
+
+
+def print_table(results):
+    columns = ["format", "concurrency", "docs", "seconds", "docs_per_s", "mb_per_s", *(f"{stage}_s" for stage in STAGES)]
+    widths = [max(len(column), *(len(str(row[column])) for row in results)) for column in columns]
+    print("  ".join(column.rjust(width) for column, width in zip(columns, widths)))
+    for row in results:
+        print("  ".join(str(row[column]).rjust(width) for column, width in zip(columns, widths)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark plate generation and bulk ingestion against a local fake _bulk endpoint")
+    parser.add_argument("formats", nargs="*", default=["all"], help=f"plate formats: {', '.join(FORMATS)} or all")
+    parser.add_argument("--docs", type=int, default=BENCH_DOCS, help="documents per run")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4], help="concurrency settings to compare")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="simulated _bulk latency")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="probability of a whole-request 429")
+    parser.add_argument("--item-reject-rate", type=float, default=0.0, help="probability of a per-document rejection")
+    parser.add_argument("--es-url", default=None, help="benchmark against this endpoint instead of starting the fake one")
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = list(FORMATS) if "all" in args.formats else args.formats
+
+    process = None
+    es_url = args.es_url
+    if es_url is None:
+        process, es_url = start_fake_es(args.latency_ms, args.reject_rate, args.item_reject_rate)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in names:
+            for concurrency in args.concurrency:
+                checkpoint_path = os.path.join(tmp, f"{name}_{concurrency}.json")
+                results.append(run_case(get_format(name), args.docs, concurrency, es_url, checkpoint_path))
+                print_table(results[-1:])
+
+    if process is not None:
+        process.terminate()
+    print()
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+
+ES_BASE_URL = "http://127.0.0.1:9200"
+CHUNK_SIZE = 1 << 20  # 流式发送时每块的字节数（1MB）
+POOL_SIZE = 4  # 连接池中保持的 keep-alive 连接数
+RETRY_STATUSES = (429, 503)  # 节点过载时返回的状态码，需要退避重试
+MAX_RETRIES = 8
+INITIAL_BACKOFF = 0.5  # 秒
+MAX_BACKOFF = 30.0
+
+# 紧凑的 JSON 编码器，避免每条文档都重新构造 json.dumps 的参数
+_encoder = json.JSONEncoder(separators=(',', ':'))
+
+
+class BulkError(Exception):
+    pass
+
+
+def create_session(pool_size=POOL_SIZE):
+    # 所有请求共用一个 Session，复用 TCP 连接，避免每批都重新握手
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def encode_bulk_body(docs, id_field="plateNumber"):
+    # 在 bytearray 中原地追加，避免字符串 += 带来的二次方拷贝
+    buf = bytearray()
+    encode = _encoder.encode
+    for doc in docs:
+        buf += b'{"index":{"_id":'
+        buf += encode(doc[id_field]).encode()
+        buf += b'}}\n'
+        buf += encode(doc).encode()
+        buf += b'\n'
+    return buf
+
+
+def iter_chunks(body, chunk_size=CHUNK_SIZE):
+    # 按块切分请求体，requests 会以 chunked 方式流式发送
+    view = memoryview(body)
+    for start in range(0, len(view), chunk_size):
+        yield bytes(view[start:start + chunk_size])
+
+
+class BulkWriter:
+    def __init__(self, index, es_url=ES_BASE_URL, session=None, chunk_size=CHUNK_SIZE, max_retries=MAX_RETRIES,
+                 initial_backoff=INITIAL_BACKOFF):
+        self.index = index
+        self.index_url = f"{es_url}/{index}"
+        # 只取回每个条目的状态和错误，减少响应体大小和解析开销；保留状态才能按位置找到被拒绝的条目
+        self.bulk_url = f"{self.index_url}/_bulk?filter_path=errors,items.*.error,items.*.status"
+        self.session = session or create_session()
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.initial_backoff = initial_backoff
+
+    def write(self, docs):
+        self.send(encode_bulk_body(docs))
+
+    def send(self, body):
+        backoff = self.initial_backoff
+        for attempt in range(self.max_retries + 1):
+            response = self.session.post(
+                self.bulk_url,
+                headers={'Content-Type': 'application/x-ndjson'},
+                data=iter_chunks(body, self.chunk_size),
+            )
+            if response.status_code not in RETRY_STATUSES:
+                response.raise_for_status()
+                errors = _item_errors(response.json())
+                failed = [error for _, error in errors if not _is_rejection(error)]
+                if failed:
+                    raise BulkError(f"Bulk request to {self.index} had errors: {failed[0]}")
+                if not errors:
+                    return
+                # 单条被拒绝（写线程池满）时只重发这些条目，按 _id 写入是幂等的
+                body = _select_items(body, [position for position, _ in errors])
+            if attempt == self.max_retries:
+                raise BulkError(f"Bulk request to {self.index} still throttled after {attempt + 1} attempts")
+            # 优先遵守 Retry-After，否则指数退避并加入抖动，避免所有线程同时重试
+            retry_after = _retry_after(response.headers.get("Retry-After"))
+            time.sleep(retry_after if retry_after is not None else backoff * random.uniform(0.5, 1.5))
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _item_errors(result):
+    # 返回 [(条目在请求中的位置, 错误), ...]
+    if not result.get("errors"):
+        return []
+    # create 操作遇到已存在的文档会返回版本冲突，说明该文档无需重写，不算错误
+    return [
+        (position, action["error"]) for position, item in enumerate(result.get("items", [])) for action in item.values()
+        if "error" in action and action["error"].get("type") != "version_conflict_engine_exception"
+    ]
+
+
+def _select_items(body, positions):
+    # 请求体中每个条目占两行（动作行 + 文档行），按位置取出需要重发的条目
+    lines = bytes(body).split(b'\n')
+    buf = bytearray()
+    for position in positions:
+        buf += lines[2 * position]
+        buf += b'\n'
+        buf += lines[2 * position + 1]
+        buf += b'\n'
+    return buf
+
+
+def _retry_after(value):
+    # Retry-After 可以是秒数，也可以是 HTTP 日期；无法解析时返回 None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_rejection(error):
+    return isinstance(error, dict) and error.get("type") == "es_rejected_execution_exception"
+
+
+class BulkPipeline:
+    # 生成线程与发送线程解耦：最多 concurrency 个请求同时在途，
+    # 另有 queue_size 个已编码的批次排队，队列满时 submit 阻塞生成端（背压）
+    def __init__(self, writer, concurrency=1, queue_size=None, on_checkpoint=None, encoder=encode_bulk_body):
+        self.writer = writer
+        self.encoder = encoder  # 把提交的批次序列化成 _bulk 请求体
+        self.on_checkpoint = on_checkpoint
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"bulk-{writer.index}")
+        self._slots = threading.BoundedSemaphore(concurrency + (concurrency if queue_size is None else queue_size))
+        self._lock = threading.Lock()
+        self._next_seq = 0
+        self._done_seq = -1  # 已连续完成的最大批次序号
+        self._finished = {}  # 乱序完成、尚未能推进检查点的批次
+        self._error = None
+
+    def submit(self, batch, checkpoint=None):
+        self._raise_if_failed()
+        body = self.encoder(batch)
+        self._slots.acquire()
+        seq = self._next_seq
+        self._next_seq += 1
+        future = self._executor.submit(self.writer.send, body)
+        future.add_done_callback(lambda f: self._on_done(seq, checkpoint, f))
+
+    def _on_done(self, seq, checkpoint, future):
+        self._slots.release()
+        if future.cancelled():
+            return
+        error = future.exception()
+        with self._lock:
+            if error is not None:
+                if self._error is None:
+                    self._error = error
+                return
+            # 批次可能乱序完成，检查点只推进到连续完成的最后一批，保证断点续传不丢数据
+            self._finished[seq] = checkpoint
+            latest = None
+            while self._done_seq + 1 in self._finished:
+                self._done_seq += 1
+                checkpoint = self._finished.pop(self._done_seq)
+                if checkpoint is not None:  # 没有检查点的批次只推进序号
+                    latest = checkpoint
+            if latest is not None and self.on_checkpoint is not None and self._error is None:
+                self.on_checkpoint(latest)
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._raise_if_failed()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            return False
+        self.close()
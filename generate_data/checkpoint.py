@@ -0,0 +1,39 @@
+import json
+import os
+
+
+def checkpoint_file(name):
+    return f"./{name}_cache.json"
+
+
+def load_cache(cache_file):
+    if os.path.exists(cache_file):
+        with open(cache_file, 'r') as f:
+            return json.load(f)
+    return None
+
+
+def save_cache(data, cache_file):
+    # 先写临时文件再原子替换，中断或汇总进度时不会读到写了一半的检查点
+    tmp_file = cache_file + ".tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_file, cache_file)
+
+
+def read_progress(cache_file, start, stop):
+    # 返回该区间下一个待生成的序号；检查点属于不同的切分方式时直接报错，避免错位续传
+    state = load_cache(cache_file)
+    if state is None:
+        return start
+    if state.get("start", start) != start or state.get("stop", stop) != stop:
+        raise ValueError(f"{cache_file} covers [{state.get('start')}, {state.get('stop')}), expected [{start}, {stop})")
+    return state["ordinal"]
+
+
+def load_start_ordinal(layout, cache_file, start=0, stop=None):
+    state = load_cache(cache_file)
+    if state and "ordinal" not in state:
+        # 兼容旧格式的检查点：记录的是最后写入的车牌，从下一个序号继续
+        return layout.encode(*(state[key] for key in layout.legacy_keys)) + 1
+    return read_progress(cache_file, start, layout.size if stop is None else stop)
@@ -0,0 +1,152 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# 本地替身：只实现生成器用到的接口（HEAD/PUT/DELETE 索引、_settings、_bulk），用于压测和联调
+
+
+class FakeEsState:
+    def __init__(self, latency_ms=0.0, reject_rate=0.0, item_reject_rate=0.0):
+        self.latency_ms = latency_ms  # 每个 _bulk 请求的额外延迟
+        self.reject_rate = reject_rate  # 整个请求返回 429 的概率
+        self.item_reject_rate = item_reject_rate  # 单条文档被写线程池拒绝的概率
+        self.indices = set()
+        self.docs = 0
+        self.bytes = 0
+        self.requests = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+
+class FakeEsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def do_HEAD(self):
+        index = urlsplit(self.path).path.strip('/')
+        self._reply(200 if index in self.state.indices else 404, None)
+
+    def do_PUT(self):
+        parts = urlsplit(self.path).path.strip('/').split('/')
+        self._read_body()
+        with self.state.lock:
+            self.state.indices.add(parts[0])
+        self._reply(200, {"acknowledged": True})
+
+    def do_DELETE(self):
+        index = urlsplit(self.path).path.strip('/')
+        with self.state.lock:
+            found = index in self.state.indices
+            self.state.indices.discard(index)
+        self._reply(200 if found else 404, {"acknowledged": True} if found else None)
+
+    def do_GET(self):
+        with self.state.lock:
+            stats = {"docs": self.state.docs, "bytes": self.state.bytes,
+                     "requests": self.state.requests, "rejected": self.state.rejected}
+        self._reply(200, stats)
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        body = self._read_body()
+        if not url.path.endswith("/_bulk"):
+            self._reply(200, {"acknowledged": True})
+            return
+
+        started = time.perf_counter()
+        if self.state.latency_ms:
+            time.sleep(self.state.latency_ms / 1000)
+        if random.random() < self.state.reject_rate:
+            with self.state.lock:
+                self.state.rejected += 1
+            self._reply(429, {"error": {"type": "es_rejected_execution_exception"}, "status": 429})
+            return
+
+        lines = body.count(b'\n')
+        docs = lines // 2
+        rejected = [random.random() < self.state.item_reject_rate for _ in range(docs)] if self.state.item_reject_rate else [False] * docs
+        failed = sum(rejected)
+        with self.state.lock:
+            self.state.requests += 1
+            self.state.docs += docs - failed
+            self.state.bytes += len(body)
+
+        took = int((time.perf_counter() - started) * 1000)
+        filter_path = parse_qs(url.query).get("filter_path", [""])[0]
+        error = {"type": "es_rejected_execution_exception", "reason": "rejected execution of coordinating operation"}
+        items = [
+            {"index": {"status": 429, "error": error} if reject else {"_id": str(i), "status": 201, "result": "created"}}
+            for i, reject in enumerate(rejected)
+        ]
+        if "items.*.status" in filter_path:
+            # 与 ES 一致：保留状态时每个条目都在，位置与请求中的顺序对应
+            response = {"errors": bool(failed), "items": [
+                {action: {key: value for key, value in result.items() if key in ("status", "error")}}
+                for item in items for action, result in item.items()
+            ]}
+        elif filter_path:
+            # 只过滤错误时只返回出错的条目
+            response = {"errors": bool(failed)}
+            if failed:
+                response["items"] = [item for item in items if "error" in item["index"]]
+        else:
+            response = {"took": took, "errors": bool(failed), "items": items}
+        self._reply(200, response)
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+            return b''.join(chunks)
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode() if payload is not None else b''
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_server(host="127.0.0.1", port=0, **options):
+    handler = type("Handler", (FakeEsHandler,), {"state": FakeEsState(**options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(port, latency_ms=0.0, reject_rate=0.0, item_reject_rate=0.0, ready=None):
+    server = make_server(port=port, latency_ms=latency_ms, reject_rate=reject_rate, item_reject_rate=item_reject_rate)
+    if ready is not None:
+        ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Elasticsearch _bulk endpoint")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--reject-rate", type=float, default=0.0)
+    parser.add_argument("--item-reject-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    print(f"Fake Elasticsearch listening on http://127.0.0.1:{args.port}")
+    serve(args.port, args.latency_ms, args.reject_rate, args.item_reject_rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import argparse
+import threading
+from functools import partial
+from bulk_writer import ES_BASE_URL, BulkWriter, BulkPipeline, create_session
+from checkpoint import checkpoint_file, load_start_ordinal, save_cache
+from index_config import check_and_create_index, create_load_index, finish_load, index_config, versioned_index
+from partition import run_partitioned
+from plate_blocks import iter_blocks, render_bulk_body
+from plate_formats import FORMATS, get_format
+from pricing import PRICING_SEED
+
+BULK_SIZE = 1000
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate UK number plates into Elasticsearch")
+    parser.add_argument("formats", nargs="*", default=["all"], help=f"plate formats to generate: {', '.join(FORMATS)} or all")
+    parser.add_argument("--es-url", default=ES_BASE_URL, help="Elasticsearch base URL")
+    parser.add_argument("--concurrency", type=int, default=1, help="number of bulk requests kept in flight per format")
+    parser.add_argument("--queue-size", type=int, default=None, help="encoded batches allowed to wait for a free sender")
+    parser.add_argument("--workers", type=int, default=1, help="number of processes, each generating its own slice of the keyspace")
+    parser.add_argument("--seed", type=int, default=PRICING_SEED, help="seed for the deterministic price/discount of each plate")
+    parser.add_argument("--skip-existing", action="store_true", help="use create actions so documents already in the index are not rewritten")
+    parser.add_argument("--load-version", default=None, help="bulk-load into <format>_<version> with refresh off, then force-merge and swap the <format> alias to it")
+    parser.add_argument("--replace-index", action="store_true", help="in load mode, delete a concrete index named like the alias during the swap")
+    parser.add_argument("--no-phonetic", action="store_true", help="create indices without the plateNumber.phonetic sub-field (sounds-like search served by phonetic_index.py)")
+    args = parser.parse_args(argv)
+    if "all" in args.formats:
+        args.formats = list(FORMATS)
+    unknown = [name for name in args.formats if name not in FORMATS]
+    if unknown:
+        parser.error(f"unknown plate format(s): {', '.join(unknown)}")
+    return args
+
+
+def target_index(layout, args):
+    # 导入模式写入带版本号的新索引，切换别名前搜索端仍使用旧索引
+    return versioned_index(layout.name, args.load_version) if args.load_version else layout.name
+
+
+def ingest_range(layout, start, stop, cache_file, args, session=None):
+    # 生成并写入 [start, stop) 区间的车牌，检查点只记录本区间的进度
+    writer = BulkWriter(target_index(layout, args), es_url=args.es_url, session=session or create_session(args.concurrency))
+    ordinal = load_start_ordinal(layout, cache_file, start, stop)
+    blocks = iter_blocks(layout, ordinal, stop, BULK_SIZE, args.seed)
+
+    with BulkPipeline(
+        writer, args.concurrency, args.queue_size,
+        on_checkpoint=lambda state: save_cache(state, cache_file),
+        # 整块生成，发送前才渲染成文档；--skip-existing 时用 create 跳过已写入的文档
+        encoder=partial(render_bulk_body, layout, op_type="create" if args.skip_existing else "index"),
+    ) as pipeline:
+        for block in blocks:
+            # 发送成功后再写入检查点（下一个待生成的序号）
+            pipeline.submit(block, {"ordinal": block.stop, "start": start, "stop": stop})
+    if session is None:
+        writer.close()
+
+
+def ingest_partition(start, stop, cache_file, name, args):
+    # 多进程入口：各进程按格式名重新取得布局，自己建立连接池
+    ingest_range(get_format(name), start, stop, cache_file, args)
+
+
+def run_in_process(layouts, args):
+    # 多个格式在同一进程内并行写入，共用一个连接池
+    session = create_session(args.concurrency * len(layouts))
+    errors = []
+
+    def run(layout):
+        try:
+            ingest_range(layout, 0, layout.size, checkpoint_file(target_index(layout, args)), args, session)
+        except Exception as e:
+            errors.append((layout.name, e))
+
+    threads = [threading.Thread(target=run, args=(layout,), name=f"generate-{layout.name}") for layout in layouts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    session.close()
+    for name, error in errors:
+        print(f"[{name}] generation failed: {error!r}")
+    return not errors
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    layouts = [get_format(name) for name in args.formats]
+
+    config = index_config(phonetic=not args.no_phonetic)
+    with create_session() as session:
+        for layout in layouts:
+            index_url = f"{args.es_url}/{target_index(layout, args)}"
+            if args.load_version:
+                create_load_index(session, index_url, config)
+            else:
+                check_and_create_index(session, index_url, config)  # 检查并创建索引
+
+    if args.workers > 1:
+        # 按序号区间切分给多个进程，每个分区独立续传；多个格式依次进行
+        ok = all([
+            run_partitioned(
+                layout.name, ingest_partition, layout.size, args.workers,
+                checkpoint_file(target_index(layout, args)), (layout.name, args),
+            )
+            for layout in layouts
+        ])
+    else:
+        ok = run_in_process(layouts, args)
+    if not ok:
+        raise SystemExit(1)
+    print("All possible plates generated.")
+
+    if args.load_version:
+        # 全部写完后才恢复刷新、合并段并切换别名
+        with create_session() as session:
+            for layout in layouts:
+                finish_load(session, args.es_url, target_index(layout, args), layout.name, replace_concrete_index=args.replace_index)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import copy
+import json
+from scoring import CHAR_FILTER_MAPPINGS
+
+# 索引配置
+INDEX_CONFIG = {
+    "mappings": {
+      "properties": {
+        "currency": {
+          "type": "keyword"
+        },
+        "discountPercentage": {
+          "type": "float"
+        },
+        "isAvailable": {
+          "type": "boolean"
+        },
+        "originalNumber": {
+          "type": "keyword"
+        },
+        "plateNumber": {
+          "type": "text",
+          "store": True,
+          "fields": {
+            "keyword": {
+              "type": "keyword",
+              "ignore_above": 256
+            },
+            "phonetic": {
+              "type": "text",
+              "analyzer": "phonetic_analyzer_soundex"
+            }
+          },
+          "analyzer": "letters_only_analyzer_ngram",
+          "fielddata": True
+        },
+        "plateType": {
+          "type": "keyword"
+        },
+        "price": {
+          "type": "float"
+        }
+      }
+    },
+    "settings": {
+      "index": {
+        "max_ngram_diff": "4",
+        "routing": {
+          "allocation": {
+            "include": {
+              "_tier_preference": "data_content"
+            }
+          }
+        },
+        "number_of_shards": "1",
+        "analysis": {
+          "filter": {
+            "soundex_filter": {
+              "replace": "false",
+              "type": "phonetic",
+              "encoder": "soundex"
+            }
+          },
+          "char_filter": {
+            "first_token_filter": {
+              "pattern": """(\S+)(\s+\S+)?""",
+              "type": "pattern_replace",
+              "replacement": "$1"
+            },
+            "remove_spaces_filter": {
+              "pattern": """\s+""",
+              "type": "pattern_replace",
+              "replacement": ""
+            },
+            "remove_digits_and_spaces_filter": {
+              "pattern": """[\d\s]+""",
+              "type": "pattern_replace",
+              "replacement": ""
+            },
+            "character_replacement_filter": {
+              "type": "mapping",
+              "mappings": CHAR_FILTER_MAPPINGS  # 由 python_code/confusion_model.py 的相似度表生成
+            },
+            "second_token_filter": {
+              "pattern": """(\S+\s+)?(\S+)""",
+              "type": "pattern_replace",
+              "replacement": "$2"
+            }
+          },
+          "analyzer": {
+            "phonetic_analyzer_soundex": {
+              "filter": [
+                "lowercase",
+                "soundex_filter"
+              ],
+              "char_filter": [
+                "remove_digits_and_spaces_filter"
+              ],
+              "type": "custom",
+              "tokenizer": "whitespace_tokenizer"
+            },
+            "letters_only_analyzer_ngram": {
+              "type": "custom",
+              "char_filter": [
+                "remove_digits_and_spaces_filter",
+                "character_replacement_filter"
+              ],
+              "tokenizer": "ngram_tokenizer"
+            }
+          },
+          "tokenizer": {
+            "ngram_tokenizer": {
+              "token_chars": [
+                "letter"
+              ],
+              "min_gram": "2",
+              "type": "ngram",
+              "max_gram": "4"
+            },
+            "whitespace_tokenizer": {
+              "pattern": """\s+""",
+              "type": "pattern"
+            }
+          }
+        },
+        "number_of_replicas": "0"
+      }
+    }
+}
+
+def index_config(phonetic=True):
+    # phonetic=False 时不建 plateNumber.phonetic 子字段（读音查询改由本地的 phonetic_index 提供）
+    config = copy.deepcopy(INDEX_CONFIG)
+    if not phonetic:
+        analysis = config["settings"]["index"]["analysis"]
+        del config["mappings"]["properties"]["plateNumber"]["fields"]["phonetic"]
+        del analysis["analyzer"]["phonetic_analyzer_soundex"]
+        del analysis["filter"]["soundex_filter"]
+    return config
+
+
+def check_and_create_index(session, index_url, config=INDEX_CONFIG):
+    # 检查索引是否存在
+    response = session.head(index_url)
+    if response.status_code == 404:
+        print("Index not found, creating a new one...")
+        # 如果索引不存在，则创建
+        response = session.put(index_url, headers={'Content-Type': 'application/json'}, data=json.dumps(config))
+        if response.status_code == 200:
+            print("Index created successfully.")
+        else:
+            print(f"Failed to create index: {response.text}")
+    elif response.status_code == 200:
+        print("Index already exists.")
+    else:
+        print(f"Error checking index: {response.status_code} - {response.text}")
+
+FORCE_MERGE_SEGMENTS = 5
+
+
+def versioned_index(alias, version):
+    return f"{alias}_{version}"
+
+
+def create_load_index(session, index_url, config=INDEX_CONFIG):
+    # 批量导入专用的设置：关闭刷新、不建副本，导入结束后由 finish_load 恢复
+    if session.head(index_url).status_code == 200:
+        print(f"Load index {index_url} already exists, resuming into it.")
+    else:
+        config = copy.deepcopy(config)
+        config["settings"]["index"]["refresh_interval"] = "-1"
+        config["settings"]["index"]["number_of_replicas"] = "0"
+        response = session.put(index_url, headers={'Content-Type': 'application/json'}, data=json.dumps(config))
+        response.raise_for_status()
+        print(f"Load index {index_url} created with refresh disabled.")
+    # 已存在的导入索引也重新关闭刷新，中断后续传同样走快速路径
+    _put_settings(session, index_url, {"refresh_interval": "-1", "number_of_replicas": "0"})
+
+
+def finish_load(session, es_url, index, alias, max_num_segments=FORCE_MERGE_SEGMENTS, replace_concrete_index=False):
+    index_url = f"{es_url}/{index}"
+    # 恢复刷新间隔和副本数（以 INDEX_CONFIG 为准，未配置刷新间隔时恢复为默认值）
+    settings = INDEX_CONFIG["settings"]["index"]
+    _put_settings(session, index_url, {
+        "refresh_interval": settings.get("refresh_interval"),
+        "number_of_replicas": settings["number_of_replicas"],
+    })
+    session.post(f"{index_url}/_refresh").raise_for_status()
+    print(f"Force merging {index} to {max_num_segments} segments...")
+    session.post(f"{index_url}/_forcemerge", params={"max_num_segments": max_num_segments}, timeout=None).raise_for_status()
+    swap_alias(session, es_url, index, alias, replace_concrete_index)
+
+
+def swap_alias(session, es_url, index, alias, replace_concrete_index=False):
+    # 在同一个 _aliases 请求里移除旧指向、添加新指向，搜索端看不到中间状态
+    actions = []
+    response = session.get(f"{es_url}/_alias/{alias}")
+    if response.status_code == 200:
+        actions += [{"remove": {"index": old, "alias": alias}} for old in response.json() if old != index]
+    elif session.head(f"{es_url}/{alias}").status_code == 200:
+        # 同名的实体索引（旧版直接写入的 prefix/current/suffix）只能随别名切换一起删除
+        if not replace_concrete_index:
+            raise RuntimeError(f"{alias} is a concrete index; pass replace_concrete_index to delete it during the swap")
+        actions.append({"remove_index": {"index": alias}})
+    actions.append({"add": {"index": index, "alias": alias}})
+    response = session.post(f"{es_url}/_aliases", headers={'Content-Type': 'application/json'}, data=json.dumps({"actions": actions}))
+    response.raise_for_status()
+    print(f"Alias {alias} now points to {index}.")
+
+
+def _put_settings(session, index_url, settings):
+    response = session.put(f"{index_url}/_settings", headers={'Content-Type': 'application/json'}, data=json.dumps({"index": settings}))
+    response.raise_for_status()
@@ -0,0 +1,132 @@
+import argparse
+import re
+import time
+from array import array
+import numpy as np
+from index_config import INDEX_CONFIG
+from plate_formats import FORMATS, get_format
+from scoring import top_k_mixed
+
+# 与 letters_only_analyzer_ngram 保持一致：去掉数字和空格 -> 形近字符归一 -> 2~4 元组
+_ANALYSIS = INDEX_CONFIG["settings"]["index"]["analysis"]
+_STRIP = re.compile(_ANALYSIS["char_filter"]["remove_digits_and_spaces_filter"]["pattern"])
+CHAR_MAPPING = str.maketrans(dict(
+    (source.strip(), target.strip())
+    for source, target in (rule.split("=>") for rule in _ANALYSIS["char_filter"]["character_replacement_filter"]["mappings"])
+))
+MIN_GRAM = int(_ANALYSIS["tokenizer"]["ngram_tokenizer"]["min_gram"])
+MAX_GRAM = int(_ANALYSIS["tokenizer"]["ngram_tokenizer"]["max_gram"])
+
+
+def analyze(plate):
+    # 返回 ES 对 plateNumber 产生的 n 元组（去重后）
+    text = _STRIP.sub("", plate.upper()).translate(CHAR_MAPPING)
+    return {
+        text[i:i + size]
+        for size in range(MIN_GRAM, MAX_GRAM + 1)
+        for i in range(len(text) - size + 1)
+    }
+
+
+class NgramIndex:
+    # 倒排表以 CSR 形式保存：第 t 个 n 元组的文档号是 postings[offsets[t]:offsets[t + 1]]，升序 uint32
+    def __init__(self, plates, terms, offsets, postings):
+        self.plates = plates
+        self.terms = terms  # n 元组 -> 下标
+        self.offsets = offsets
+        self.postings = postings
+
+    @classmethod
+    def build(cls, plates):
+        plates = list(plates)
+        terms = {}
+        term_ids = array('I')
+        doc_ids = array('I')
+        for doc, plate in enumerate(plates):
+            for gram in analyze(plate):
+                term_ids.append(terms.setdefault(gram, len(terms)))
+                doc_ids.append(doc)
+        term_ids = np.frombuffer(term_ids, dtype=np.uint32)
+        doc_ids = np.frombuffer(doc_ids, dtype=np.uint32)
+        # 文档号本来就是递增追加的，按词项稳定排序后每条倒排表自然有序
+        order = np.argsort(term_ids, kind="stable")
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(terms)), out=offsets[1:])
+        return cls(plates, terms, offsets, doc_ids[order])
+
+    @classmethod
+    def from_layout(cls, layout, start=0, stop=None):
+        return cls.build(layout.plate_number(*parts) for parts in layout.iter_parts(start, stop))
+
+    def __len__(self):
+        return len(self.plates)
+
+    def posting(self, gram):
+        t = self.terms.get(gram)
+        if t is None:
+            return np.empty(0, dtype=np.uint32)
+        return self.postings[self.offsets[t]:self.offsets[t + 1]]
+
+    def candidates(self, query, min_should_match=1.0):
+        # min_should_match=1.0 时对所有 n 元组的倒排表求交集（从最短的开始）；
+        # 小于 1 时允许部分 n 元组缺失，按命中次数筛选，用于容忍个别字符错误
+        grams = analyze(query)
+        if not grams:
+            return np.empty(0, dtype=np.uint32)  # 与 ES 一致：没有词项的查询不命中任何文档
+        lists = sorted((self.posting(gram) for gram in grams), key=len)
+        if min_should_match >= 1.0:
+            result = lists[0]
+            for posting in lists[1:]:
+                if len(result) == 0:
+                    break
+                result = np.intersect1d(result, posting, assume_unique=True)
+            return result
+        required = max(1, int(np.ceil(min_should_match * len(lists))))
+        docs, hits = np.unique(np.concatenate(lists), return_counts=True)
+        return docs[hits >= required]
+
+    def search(self, query, k=20, min_should_match=1.0, alpha=0.5, beta=0.5, similarity_threshold=0.5, max_dist=3):
+        # 倒排表召回候选，再用 13.py 的混合相似度流式取前 k 名
+        docs = self.candidates(query, min_should_match)
+        return top_k_mixed(
+            query, ((doc, self.plates[doc]) for doc in docs.tolist()),
+            k, alpha, beta, similarity_threshold, max_dist,
+        )
+
+    def save(self, path):
+        grams = sorted(self.terms, key=self.terms.get)
+        np.savez(path, plates=np.array(self.plates), grams=np.array(grams), offsets=self.offsets, postings=self.postings)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            terms = {gram: t for t, gram in enumerate(data["grams"].tolist())}
+            return cls(data["plates"].tolist(), terms, data["offsets"], data["postings"])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build a local n-gram index over plates and run fuzzy lookups against it")
+    parser.add_argument("format", help=f"plate format: {', '.join(FORMATS)}")
+    parser.add_argument("queries", nargs="+")
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--stop", type=int, default=1_000_000)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--min-should-match", type=float, default=1.0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    started = time.perf_counter()
+    index = NgramIndex.from_layout(get_format(args.format), args.start, args.stop)
+    print(f"Indexed {len(index)} plates, {len(index.terms)} n-grams in {time.perf_counter() - started:.1f}s")
+    for query in args.queries:
+        started = time.perf_counter()
+        results = index.search(query, args.k, args.min_should_match)
+        print(f"{query}: {len(results)} results in {(time.perf_counter() - started) * 1000:.2f}ms")
+        for doc, score in results:
+            print(f"  {index.plates[doc]}  {score:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import multiprocessing
+import os
+import time
+from checkpoint import read_progress
+
+POLL_INTERVAL = 10  # 汇总进度的打印间隔（秒）
+
+
+def partition_ranges(size, parts):
+    # 把 [0, size) 切成 parts 段互不相交的连续序号区间，前 extra 段各多分一个
+    step, extra = divmod(size, parts)
+    ranges = []
+    start = 0
+    for i in range(parts):
+        stop = start + step + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def partition_cache_file(cache_file, index, parts):
+    root, ext = os.path.splitext(cache_file)
+    return f"{root}.part{index}of{parts}{ext}"
+
+
+def run_partitioned(name, target, size, workers, cache_file, args=(), poll_interval=POLL_INTERVAL):
+    # 每个分区一个进程、一个检查点文件；重新运行时已完成的分区直接跳过，只续传未完成的分区
+    ranges = partition_ranges(size, workers)
+    cache_files = [partition_cache_file(cache_file, i, workers) for i in range(workers)]
+
+    processes = []
+    for i, ((start, stop), part_cache) in enumerate(zip(ranges, cache_files)):
+        if read_progress(part_cache, start, stop) >= stop:
+            continue
+        process = multiprocessing.Process(
+            target=target,
+            args=(start, stop, part_cache, *args),
+            name=f"{name}-part{i}",
+        )
+        process.start()
+        processes.append((i, process))
+
+    while any(process.is_alive() for _, process in processes):
+        time.sleep(poll_interval)
+        if any(process.is_alive() for _, process in processes):
+            print_progress(name, ranges, cache_files)
+
+    for _, process in processes:
+        process.join()
+    print_progress(name, ranges, cache_files)
+
+    failed = [i for i, process in processes if process.exitcode != 0]
+    for i in failed:
+        start, stop = ranges[i]
+        print(f"[{name}] partition {i} [{start}, {stop}) exited with an error; rerun to resume it from {cache_files[i]}")
+    return not failed
+
+
+def print_progress(name, ranges, cache_files):
+    done = 0
+    finished_parts = 0
+    for (start, stop), part_cache in zip(ranges, cache_files):
+        try:
+            ordinal = read_progress(part_cache, start, stop)
+        except (OSError, ValueError):
+            ordinal = start  # 读到正在替换中的文件时按未开始计
+        done += ordinal - start
+        finished_parts += ordinal >= stop
+    total = ranges[-1][1] if ranges else 0
+    percent = done / total * 100 if total else 100.0
+    print(f"[{name}] {percent:.2f}% ({done}/{total} plates, {finished_parts}/{len(ranges)} partitions done)")
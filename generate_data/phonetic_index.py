@@ -0,0 +1,151 @@
+import argparse
+import re
+import time
+import numpy as np
+from index_config import INDEX_CONFIG
+from plate_formats import FORMATS, LETTERS, get_format
+
+# 与 phonetic_analyzer_soundex 保持一致：去掉数字和空格后整串是一个词，编码为美式 soundex
+# （commons-codec 的 Soundex：H、W 完全忽略，元音隔开的相同编码要重复记录）
+_STRIP = re.compile(INDEX_CONFIG["settings"]["index"]["analysis"]["char_filter"]["remove_digits_and_spaces_filter"]["pattern"])
+SOUNDEX_DIGITS = np.array([int(d) for d in "01230120022455012623010202"], dtype=np.uint8)
+_H = LETTERS.index('H')
+_W = LETTERS.index('W')
+_PLACES = np.array([0, 100, 10, 1, 0], dtype=np.uint16)  # 第 count 个输出字符的位值
+
+
+def soundex_codes(letters):
+    # letters 为 (n, 长度) 的字母下标矩阵，按列逐位推进，一次算出 n 个编码。
+    # 编码存为整数：首字母下标 * 1000 + 三位数字，最大 25666，放得进 uint16
+    letters = np.asarray(letters, dtype=np.uint8)
+    digits = SOUNDEX_DIGITS[letters]
+    codes = letters[:, 0].astype(np.uint16) * 1000
+    count = np.ones(len(letters), dtype=np.uint8)  # 已输出的字符数，首字母算一个
+    last = digits[:, 0].copy()
+    for i in range(1, letters.shape[1]):
+        digit = digits[:, i]
+        ignored = (letters[:, i] == _H) | (letters[:, i] == _W)
+        emit = ~ignored & (digit != 0) & (digit != last) & (count < 4)
+        codes += emit * digit * _PLACES[count]
+        count += emit
+        last = np.where(ignored, last, digit)
+    return codes
+
+
+def soundex(text):
+    # 返回编码整数，没有字母时返回 None（ES 对空串不产生词项）
+    letters = [LETTERS.index(c) for c in _STRIP.sub("", text.upper()) if c in LETTERS]
+    if not letters:
+        return None
+    return int(soundex_codes([letters])[0])
+
+
+def format_code(code):
+    return f"{LETTERS[code // 1000]}{code % 1000:03d}"
+
+
+class PhoneticIndex:
+    # 一个格式的 soundex 倒排表。编码只取决于字母部分（头部 + 尾部），所以倒排表里存的是
+    # 字母组合 combo = head * tail_size + tail，而不是车牌序号：每个组合对应 len(numbers) 个车牌，
+    # 查询时再按混合进制展开。CSR 形式：编码 terms[i] 的组合为 combos[offsets[i]:offsets[i + 1]]，升序
+    def __init__(self, layout, terms, offsets, combos):
+        self.layout = layout
+        self.terms = terms
+        self.offsets = offsets
+        self.combos = combos
+
+    @classmethod
+    def build(cls, layout):
+        combos = np.arange(layout.head_size * layout.tail_size, dtype=np.uint32)
+        head, tail = np.divmod(combos, layout.tail_size)
+        columns = []
+        for value, length in ((head, layout.head_len), (tail, layout.tail_len)):
+            for power in reversed(range(length)):
+                columns.append(value // 26 ** power % 26)
+        codes = soundex_codes(np.column_stack(columns))
+        # 组合号本来就是递增的，按编码稳定排序后每条倒排表自然有序
+        order = np.argsort(codes, kind="stable")
+        terms, counts = np.unique(codes[order], return_counts=True)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(layout, terms, offsets, combos[order])
+
+    def lookup(self, code):
+        if code is None:
+            return self.combos[:0]
+        i = np.searchsorted(self.terms, code)
+        if i == len(self.terms) or self.terms[i] != code:
+            return self.combos[:0]
+        return self.combos[self.offsets[i]:self.offsets[i + 1]]
+
+    def count(self, word):
+        return len(self.lookup(soundex(word))) * len(self.layout.numbers)
+
+    def page(self, word, page=0, size=20):
+        # 第 page 页匹配车牌的序号，按序号升序。序号顺序是 头部 -> 数字 -> 尾部，
+        # 所以先按头部把组合分组，每组贡献 组内组合数 * len(numbers) 个匹配
+        combos = self.lookup(soundex(word)).astype(np.int64)
+        numbers = len(self.layout.numbers)
+        heads, tails = np.divmod(combos, self.layout.tail_size)
+        group_starts = np.flatnonzero(np.r_[True, heads[1:] != heads[:-1]]) if len(combos) else np.empty(0, dtype=np.int64)
+        group_sizes = np.diff(np.r_[group_starts, len(combos)])
+        group_ends = np.cumsum(group_sizes * numbers)
+        total = int(group_ends[-1]) if len(group_ends) else 0
+        m = np.arange(page * size, min((page + 1) * size, total), dtype=np.int64)
+        g = np.searchsorted(group_ends, m, side="right")
+        number, j = np.divmod(m - (group_ends[g] - group_sizes[g] * numbers), group_sizes[g])
+        c = group_starts[g] + j
+        return (heads[c] * numbers + number) * self.layout.tail_size + tails[c]
+
+    def plates(self, word, page=0, size=20):
+        layout = self.layout
+        return [layout.plate_number(*layout.parts(ordinal)) for ordinal in self.page(word, page, size).tolist()]
+
+    def save(self, path):
+        np.savez(path, format=np.array(self.layout.name), terms=self.terms, offsets=self.offsets, combos=self.combos)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(get_format(str(data["format"])), data["terms"], data["offsets"], data["combos"])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query a local soundex index of plates that sound like a word")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="index every plate of the given formats")
+    build.add_argument("formats", nargs="+", help=f"plate formats: {', '.join(FORMATS)}")
+
+    query = sub.add_parser("query", help="list plates that sound like each word")
+    query.add_argument("format", help=f"plate format: {', '.join(FORMATS)}")
+    query.add_argument("words", nargs="+")
+    query.add_argument("--index", default=None, help="index file (defaults to ./<format>_phonetic.npz)")
+    query.add_argument("--page", type=int, default=0)
+    query.add_argument("--size", type=int, default=20)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "build":
+        for name in args.formats:
+            started = time.perf_counter()
+            index = PhoneticIndex.build(get_format(name))
+            out = f"./{name}_phonetic.npz"
+            index.save(out)
+            print(f"[{name}] {len(index.combos)} letter combinations, {len(index.terms)} codes in {time.perf_counter() - started:.1f}s -> {out}")
+    else:
+        index = PhoneticIndex.load(args.index or f"./{args.format}_phonetic.npz")
+        for word in args.words:
+            started = time.perf_counter()
+            plates = index.plates(word, args.page, args.size)
+            code = soundex(word)
+            print(f"{word} ({format_code(code) if code is not None else '-'}): {index.count(word)} plates, "
+                  f"page in {(time.perf_counter() - started) * 1000:.2f}ms")
+            for plate in plates:
+                print(f"  {plate}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+from collections import namedtuple
+import numpy as np
+from pricing import PRICING_SEED, block_prices, plate_price
+
+BLOCK_SIZE = 1000
+
+# 一段连续序号 [start, stop) 的车牌，按列存放：头部/尾部字母串下标、数字下标、价格和折扣
+PlateBlock = namedtuple("PlateBlock", "start stop head number tail price discount")
+
+_DOC_LINES = (
+    '{"%s":{"_id":"%s"}}\n'
+    '{"plateNumber":"%s","originalNumber":"%s","plateType":"%s","currency":"GBP",'
+    '"price":%r,"discountPercentage":%r,"isAvailable":false}\n'
+)
+
+
+def generate_block(layout, start, stop, seed=PRICING_SEED):
+    # 一次性把整段序号拆成三段下标，价格和折扣也由序号整列算出
+    ordinals = np.arange(start, stop, dtype=np.int64)
+    rest, tail = np.divmod(ordinals, layout.tail_size)
+    head, number = np.divmod(rest, len(layout.numbers))
+    price, discount = block_prices(layout.name, ordinals, seed)
+    return PlateBlock(start, stop, head, number, tail, price, discount)
+
+
+def iter_blocks(layout, start=0, stop=None, block_size=BLOCK_SIZE, seed=PRICING_SEED):
+    stop = layout.size if stop is None else min(stop, layout.size)
+    for block_start in range(start, stop, block_size):
+        yield generate_block(layout, block_start, min(block_start + block_size, stop), seed)
+
+
+def render_bulk_body(layout, block, op_type="index"):
+    # 只在序列化时才把数组渲染成 NDJSON，字段顺序与逐条生成的文档一致；
+    # op_type 为 "create" 时已存在的文档会被 ES 跳过（内容只由序号决定，重放时不会变化）
+    heads = layout.head_strings
+    tails = layout.tail_strings
+    numbers = [str(number) for number in layout.numbers]
+    plate_types = [layout.plate_type(number) for number in layout.numbers]
+    plate_number = layout.plate_number
+    lines = []
+    for h, n, t, price, discount in zip(
+        block.head.tolist(), block.number.tolist(), block.tail.tolist(), block.price.tolist(), block.discount.tolist()
+    ):
+        head, number, tail = heads[h], numbers[n], tails[t]
+        plate = plate_number(head, number, tail)
+        lines.append(_DOC_LINES % (op_type, plate, plate, head + number + tail, plate_types[n], price, discount))
+    return ''.join(lines).encode()
+
+
+def plate_document(layout, ordinal, head, number, tail, seed=PRICING_SEED):
+    price, discount_percentage = plate_price(layout.name, ordinal, seed)
+    plate = layout.plate_number(head, number, tail)
+    return {
+        "plateNumber": plate,
+        "originalNumber": f"{head}{number}{tail}",
+        "plateType": layout.plate_type(number),
+        "currency": "GBP",
+        "price": price,
+        "discountPercentage": discount_percentage,
+        "isAvailable": False
+    }
+
+
+def plate_documents(layout, start=0, stop=None, seed=PRICING_SEED):
+    # 逐条生成文档字典，内容与 render_bulk_body 渲染出的完全一致
+    for ordinal, (head, number, tail) in enumerate(layout.iter_parts(start, stop), start):
+        yield plate_document(layout, ordinal, head, number, tail, seed)
@@ -0,0 +1,154 @@
+import string
+
+LETTERS = string.ascii_uppercase
+
+# 自定义的数字迭代区间
+PREFIX_NUMBERS = [
+    1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20,
+    21, 22, 23, 24, 25, 26, 27, 28, 29, 30, 31, 33, 40, 44, 50, 55, 60, 66,
+    70, 77, 80, 88, 90, 99, 100, 111, 123, 155, 200, 222, 300, 321, 333,
+    400, 444, 500, 555, 600, 666, 700, 777, 800, 888, 900, 999
+]
+
+# 当前样式的数字迭代序列
+CURRENT_NUMBERS = sorted([
+    51, 2, 52, 3, 53, 4, 54, 5, 55, 6, 56, 7, 57, 8, 58, 9, 59,
+    10, 60, 11, 61, 12, 62, 13, 63, 14, 64, 15, 65, 16, 66, 17,
+    67, 18, 68, 19, 69, 20, 70, 21, 71, 22, 72, 23, 73, 24, 74
+])
+
+SUFFIX_NUMBERS = list(range(1, 1000))  # 数字从1到999
+
+
+def letter_strings(length):
+    # 按字典序生成所有定长字母串（AAA 到 ZZZ），下标即其 26 进制值
+    strings = ['']
+    for _ in range(length):
+        strings = [s + c for s in strings for c in LETTERS]
+    return strings
+
+
+class PlateLayout:
+    # 车牌由「头部字母 + 数字 + 尾部字母」三段组成，迭代顺序为头部最外层、尾部最内层。
+    # 序号是混合进制数：ordinal = (head * len(numbers) + number_index) * 26**tail_len + tail
+    # 头部或尾部长度可以为 0（如 dateless 的 "ABC 123"、"1234 AB"）
+    def __init__(self, name, head_len, numbers, tail_len, template, legacy_keys=None):
+        self.name = name
+        self.template = template  # plateNumber 的格式，如 "{head}{number} {tail}"
+        self.legacy_keys = legacy_keys  # 旧版检查点中 (头部, 数字, 尾部) 对应的键名
+        self.head_len = head_len
+        self.tail_len = tail_len
+        self.numbers = list(numbers)
+        self.number_index = {number: i for i, number in enumerate(self.numbers)}
+        self.head_strings = letter_strings(head_len)
+        self.tail_strings = letter_strings(tail_len)
+        self.head_size = len(self.head_strings)
+        self.tail_size = len(self.tail_strings)
+        self.size = self.head_size * len(self.numbers) * self.tail_size
+        # 前端 SearchModule 的逐位下拉框：L 为字母位，N 为数字位（数字左对齐，位数不足时后面的数字位为空）
+        self.number_len = max(len(str(number)) for number in self.numbers)
+        self.slots = "L" * head_len + "N" * self.number_len + "L" * tail_len
+
+    def encode(self, head, number, tail):
+        head_idx = _letters_value(head)
+        tail_idx = _letters_value(tail)
+        try:
+            number_idx = self.number_index[int(number)]
+        except KeyError:
+            raise ValueError(f"{number} is not a valid {self.name} number") from None
+        return (head_idx * len(self.numbers) + number_idx) * self.tail_size + tail_idx
+
+    def decode(self, ordinal):
+        if not 0 <= ordinal < self.size:
+            raise ValueError(f"ordinal {ordinal} out of range for {self.name} (size {self.size})")
+        rest, tail_idx = divmod(ordinal, self.tail_size)
+        head_idx, number_idx = divmod(rest, len(self.numbers))
+        return head_idx, number_idx, tail_idx
+
+    def parts(self, ordinal):
+        head_idx, number_idx, tail_idx = self.decode(ordinal)
+        return self.head_strings[head_idx], self.numbers[number_idx], self.tail_strings[tail_idx]
+
+    def plate_number(self, head, number, tail):
+        return self.template.format(head=head, number=number, tail=tail)
+
+    def plate_type(self, number):
+        return f"{self.name}_{len(str(number))}_num"
+
+    def split_plate(self, plate):
+        # 按头尾字母的固定长度切分，中间剩下的就是数字，不受 1 位/3 位数字影响
+        compact = plate.replace(' ', '').upper()
+        head = compact[:self.head_len]
+        tail = compact[len(compact) - self.tail_len:]
+        number = compact[self.head_len:len(compact) - self.tail_len]
+        if not (_is_letters(head) and _is_letters(tail) and number.isdigit()):
+            raise ValueError(f"{plate!r} is not a {self.name} plate")
+        return head, int(number), tail
+
+    def plate_ordinal(self, plate):
+        return self.encode(*self.split_plate(plate))
+
+    def iter_parts(self, start=0, stop=None):
+        # 直接从 start 对应的三段下标开始嵌套迭代，无需从头扫描
+        stop = self.size if stop is None else min(stop, self.size)
+        if start >= stop:
+            return
+        head_idx, number_idx, tail_idx = self.decode(start)
+        remaining = stop - start
+        for h in range(head_idx, self.head_size):
+            head = self.head_strings[h]
+            for n in range(number_idx, len(self.numbers)):
+                number = self.numbers[n]
+                for t in range(tail_idx, self.tail_size):
+                    yield head, number, self.tail_strings[t]
+                    remaining -= 1
+                    if remaining == 0:
+                        return
+                tail_idx = 0  # 当数字变化时，重置尾部字母为初始值
+            number_idx = 0  # 当头部字母变化时，重置数字为初始值
+
+
+def _is_letters(s):
+    return all('A' <= c <= 'Z' for c in s)
+
+
+def _letters_value(letters):
+    value = 0
+    for c in letters.upper():
+        idx = ord(c) - ord('A')
+        if not 0 <= idx < 26:
+            raise ValueError(f"{letters!r} contains a non-letter character")
+        value = value * 26 + idx
+    return value
+
+
+# 车牌格式注册表：新增格式（dateless、北爱尔兰等）只需构造 PlateLayout 并注册
+FORMATS = {}
+
+
+def register_format(layout):
+    if layout.name in FORMATS:
+        raise ValueError(f"plate format {layout.name!r} is already registered")
+    FORMATS[layout.name] = layout
+    return layout
+
+
+def get_format(name):
+    try:
+        return FORMATS[name]
+    except KeyError:
+        raise ValueError(f"unknown plate format {name!r}, expected one of {', '.join(FORMATS)}") from None
+
+
+PREFIX = register_format(PlateLayout(
+    "prefix", 1, PREFIX_NUMBERS, 3, "{head}{number} {tail}",
+    legacy_keys=("prefix_letter", "prefix_number", "suffix"),
+))
+CURRENT = register_format(PlateLayout(
+    "current", 2, CURRENT_NUMBERS, 3, "{head}{number} {tail}",
+    legacy_keys=("prefix", "prefix_number", "suffix"),
+))
+SUFFIX = register_format(PlateLayout(
+    "suffix", 3, SUFFIX_NUMBERS, 1, "{head} {number}{tail}",
+    legacy_keys=("prefix", "number", "suffix_letter"),
+))
@@ -0,0 +1,130 @@
+import argparse
+import time
+import joblib
+import numpy as np
+from sklearn.neighbors import NearestNeighbors
+from plate_formats import FORMATS, get_format
+from scoring import display_sim
+
+PLATE_WIDTH = 8  # plateNumber 含空格最多 8 个字符，向量维度固定为 8*36
+LEAF_SIZE = 40
+REBUILD_RATIO = 0.1  # 增量缓冲超过基础索引的 10% 时自动重建
+
+
+class PlateNeighbors:
+    # 基础部分是 ball tree；之后新增的车牌先放进增量缓冲，查询时与缓冲暴力比较再合并结果，
+    # 缓冲过大时把两部分合在一起重建。向量已归一化，欧氏距离与余弦相似度单调对应：d² = 2 - 2cos
+    def __init__(self, width=PLATE_WIDTH, leaf_size=LEAF_SIZE, rebuild_ratio=REBUILD_RATIO):
+        self.width = width
+        self.leaf_size = leaf_size
+        self.rebuild_ratio = rebuild_ratio
+        self.plates = []  # 前 base_size 个在树里，其余在增量缓冲里
+        self.base_size = 0
+        self.tree = None
+        self.delta = np.empty((0, width * 36), dtype=np.float32)
+
+    def encode(self, plates):
+        too_long = [plate for plate in plates if len(plate) > self.width]
+        if too_long:
+            raise ValueError(f"{too_long[0]!r} is longer than {self.width} characters")
+        return display_sim.encode_plates(plates, self.width)
+
+    def add(self, plates):
+        plates = list(plates)
+        self.plates.extend(plates)
+        self.delta = np.vstack([self.delta, self.encode(plates)])
+        if len(self.delta) > self.rebuild_ratio * self.base_size:
+            self.rebuild()
+
+    def rebuild(self):
+        vectors = self.encode(self.plates)
+        self.tree = NearestNeighbors(algorithm="ball_tree", leaf_size=self.leaf_size).fit(vectors)
+        self.base_size = len(self.plates)
+        self.delta = self.delta[:0]
+
+    def query(self, plates, k=10):
+        # 返回每个查询的 [(车牌, 余弦相似度), ...]，按相似度从高到低
+        vectors = self.encode(plates)
+        k = min(k, len(self.plates))
+        if k == 0:
+            return [[] for _ in plates]
+        distances = np.empty((len(plates), 0), dtype=np.float32)
+        ids = np.empty((len(plates), 0), dtype=np.int64)
+        if self.tree is not None:
+            distances, ids = self.tree.kneighbors(vectors, min(k, self.base_size))
+        if len(self.delta):
+            delta_sim = vectors @ self.delta.T
+            delta_distances = np.sqrt(np.maximum(2 - 2 * delta_sim, 0))
+            distances = np.hstack([distances, delta_distances])
+            ids = np.hstack([ids, np.broadcast_to(np.arange(len(self.delta)) + self.base_size, delta_sim.shape)])
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        return [
+            [(self.plates[ids[q, i]], float(1 - distances[q, i] ** 2 / 2)) for i in order[q]]
+            for q in range(len(plates))
+        ]
+
+    def save(self, path):
+        # 只保存状态（车牌、拟合好的树、增量缓冲），不直接序列化本类：
+        # CLI 里的实例属于 __main__，从其他模块加载时会找不到类
+        joblib.dump({
+            "width": self.width,
+            "leaf_size": self.leaf_size,
+            "rebuild_ratio": self.rebuild_ratio,
+            "plates": self.plates,
+            "base_size": self.base_size,
+            "tree": self.tree,
+            "delta": self.delta,
+        }, path)
+
+    @classmethod
+    def load(cls, path):
+        state = joblib.load(path)
+        index = cls(state["width"], state["leaf_size"], state["rebuild_ratio"])
+        index.plates = state["plates"]
+        index.base_size = state["base_size"]
+        index.tree = state["tree"]
+        index.delta = state["delta"]
+        return index
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query a nearest-neighbour index of visually similar plates")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="index a range of a plate format")
+    build.add_argument("format", help=f"plate format: {', '.join(FORMATS)}")
+    build.add_argument("--start", type=int, default=0)
+    build.add_argument("--stop", type=int, default=100_000)
+    build.add_argument("--out", default=None, help="index file (defaults to ./<format>_neighbors.joblib)")
+    build.add_argument("--append", action="store_true", help="add the range to an existing index instead of starting over")
+
+    query = sub.add_parser("query", help="print the most similar indexed plates")
+    query.add_argument("index")
+    query.add_argument("plates", nargs="+")
+    query.add_argument("--k", type=int, default=10)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "build":
+        layout = get_format(args.format)
+        out = args.out or f"./{layout.name}_neighbors.joblib"
+        index = PlateNeighbors.load(out) if args.append else PlateNeighbors()
+        started = time.perf_counter()
+        index.add(layout.plate_number(*parts) for parts in layout.iter_parts(args.start, args.stop))
+        index.save(out)
+        print(f"[{layout.name}] {len(index.plates)} plates indexed in {time.perf_counter() - started:.1f}s -> {out}")
+    else:
+        index = PlateNeighbors.load(args.index)
+        started = time.perf_counter()
+        results = index.query(args.plates, args.k)
+        print(f"{len(args.plates)} queries in {(time.perf_counter() - started) * 1000:.2f}ms")
+        for plate, neighbours in zip(args.plates, results):
+            print(plate)
+            for neighbour, similarity in neighbours:
+                print(f"  {neighbour}  {similarity:.4f}")
+
+
+if __name__ == "__main__":
+    main()
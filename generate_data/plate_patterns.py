@@ -0,0 +1,212 @@
+import argparse
+from functools import lru_cache
+from plate_blocks import plate_document
+from plate_formats import FORMATS, LETTERS, get_format
+from pricing import PRICING_SEED
+
+# 槽位取值（与前端 SearchModule 的下拉框一致）
+ANY = ''  # 不限
+DIGIT = '*'  # 任意一位数字（该位必须存在）；字母位上等同于不限
+ABSENT = '-'  # 该数字位不存在（数字左对齐，如 "A1 BCD" 的第 2、3 个数字位）
+
+
+class LetterChoices:
+    # 一段定长字母的可选集合，按位存放允许的字母下标。
+    # 各位都升序时，第 i 个组合就是 i 在混合进制 (len(位0), len(位1), ...) 下的各位，
+    # 因此无需展开就能按序取到第 i 个值（即该字母串在 26 进制下的下标）
+    def __init__(self, positions):
+        self.positions = positions
+        self.count = 1
+        for allowed in positions:
+            self.count *= len(allowed)
+
+    def value(self, i):
+        value = 0
+        scale = 1
+        for allowed in reversed(self.positions):
+            i, d = divmod(i, len(allowed))
+            value += allowed[d] * scale
+            scale *= len(LETTERS)
+        return value
+
+    def runs(self):
+        # 连续的下标合并为 [start, stop) 区间
+        runs = []
+        for i in range(self.count):
+            v = self.value(i)
+            if runs and runs[-1][1] == v:
+                runs[-1][1] = v + 1
+            else:
+                runs.append([v, v + 1])
+        return runs
+
+
+def _slot_value(value):
+    # 槽位取值为字符串，None 等同于不限；其他类型（如 JSON 中的数字 1）不做猜测
+    if value is None:
+        return ANY
+    if not isinstance(value, str):
+        raise ValueError(f"{value!r} is not a string slot value")
+    return value
+
+
+def _letter_choices(values):
+    positions = []
+    for value in values:
+        value = _slot_value(value).upper()
+        if value in (ANY, DIGIT):
+            positions.append(list(range(len(LETTERS))))
+        elif len(value) == 1 and value in LETTERS:
+            positions.append([LETTERS.index(value)])
+        else:
+            raise ValueError(f"{value!r} is not a letter slot value")
+    return LetterChoices(positions)
+
+
+def _digit_values(values):
+    values = [_slot_value(value) for value in values]
+    for value in values:
+        if value not in (ANY, DIGIT, ABSENT) and not (len(value) == 1 and value.isdigit()):
+            raise ValueError(f"{value!r} is not a digit slot value")
+    return values
+
+
+def _number_matches(number, digits):
+    for j, value in enumerate(digits):
+        present = j < len(number)
+        if value == DIGIT and not present:
+            return False
+        if value == ABSENT and present:
+            return False
+        if value not in (ANY, DIGIT, ABSENT) and (not present or number[j] != value):
+            return False
+    return True
+
+
+@lru_cache(maxsize=4096)
+def _matching_numbers(layout, digits):
+    # 数字位的取值组合不多，同一格式上的结果缓存起来（生成式搜索会反复编译相近的模式）
+    return [i for i, number in enumerate(layout.numbers) if _number_matches(str(number), digits)]
+
+
+class CompiledPattern:
+    # 模式编译成三段各自允许的下标：头部字母、数字（layout.numbers 中的下标）、尾部字母。
+    # 匹配数是三者之积，第 m 个匹配的序号按混合进制直接算出，计数和翻页都与匹配数量无关
+    def __init__(self, layout, pattern):
+        if len(pattern) != len(layout.slots):
+            raise ValueError(f"{layout.name} patterns have {len(layout.slots)} slots, got {len(pattern)}")
+        head_end = layout.head_len
+        number_end = head_end + layout.number_len
+        self.layout = layout
+        self.pattern = list(pattern)
+        self.heads = _letter_choices(pattern[:head_end])
+        self.digits = _digit_values(pattern[head_end:number_end])
+        self.tails = _letter_choices(pattern[number_end:])
+        self.numbers = _matching_numbers(layout, tuple(self.digits))
+        self.count = self.heads.count * len(self.numbers) * self.tails.count
+
+    def ordinal(self, m):
+        if not 0 <= m < self.count:
+            raise IndexError(f"match {m} out of range (count {self.count})")
+        rest, t = divmod(m, self.tails.count)
+        h, n = divmod(rest, len(self.numbers))
+        return (self.heads.value(h) * len(self.layout.numbers) + self.numbers[n]) * self.layout.tail_size + self.tails.value(t)
+
+    def page(self, page, size):
+        # 第 page 页（从 0 开始）的序号，按序号升序
+        start = page * size
+        return [self.ordinal(m) for m in range(start, min(start + size, self.count))]
+
+    def iter_ordinals(self, start=0):
+        for m in range(start, self.count):
+            yield self.ordinal(m)
+
+    def iter_ranges(self):
+        # 匹配的序号合并成连续区间 [start, stop)；尾部不限时每个 (头部, 数字) 就是一整段
+        tail_runs = self.tails.runs() if self.count else []
+        numbers = len(self.layout.numbers)
+        pending = None
+        for h in range(self.heads.count):
+            head = self.heads.value(h)
+            for n in self.numbers:
+                base = (head * numbers + n) * self.layout.tail_size
+                for start, stop in tail_runs:
+                    if pending and pending[1] == base + start:
+                        pending[1] = base + stop
+                        continue
+                    if pending:
+                        yield tuple(pending)
+                    pending = [base + start, base + stop]
+        if pending:
+            yield tuple(pending)
+
+    def documents(self, page, size, seed=PRICING_SEED):
+        # 文档内容与生成器写入 ES 的一致（价格由序号决定）
+        return [plate_document(self.layout, ordinal, *self.layout.parts(ordinal), seed) for ordinal in self.page(page, size)]
+
+    def regexp(self):
+        # originalNumber 上的等价正则；数字部分只约束形状，具体取值由索引中实际存在的车牌保证
+        layout = self.layout
+        head = ''.join(_letter_regexp(value) for value in self.pattern[:layout.head_len])
+        tail = ''.join(_letter_regexp(value) for value in self.pattern[layout.head_len + layout.number_len:])
+        shapes = []
+        for length in range(1, layout.number_len + 1):
+            if any(value == ABSENT for value in self.digits[:length]) or any(value not in (ANY, ABSENT) for value in self.digits[length:]):
+                continue
+            shapes.append(''.join('[0-9]' if value in (ANY, DIGIT) else value for value in self.digits[:length]))
+        if not shapes:
+            return None  # 不可能匹配（如先缺省后又指定数字）
+        return f"{head}({'|'.join(shapes)}){tail}"
+
+    def es_query(self, page=0, size=20, min_price=None, max_price=None, available=None):
+        # 只有带价格或可售状态过滤时才需要查询 ES，序号运算无法得知这些字段的当前值。
+        # 注意排序与 page() 不同：这里按 originalNumber 字符串排序（A1、A10、A100、A11 ...），
+        # page() 按序号（数字部分按数值）。文档中没有序号字段，ES 无法廉价地按序号排序
+        regexp = self.regexp()
+        filters = [{"regexp": {"originalNumber": regexp}} if regexp else {"match_none": {}}]
+        if min_price is not None or max_price is not None:
+            price = {}
+            if min_price is not None:
+                price["gte"] = min_price
+            if max_price is not None:
+                price["lte"] = max_price
+            filters.append({"range": {"price": price}})
+        if available is not None:
+            filters.append({"term": {"isAvailable": available}})
+        return {
+            "from": page * size,
+            "size": size,
+            "track_total_hits": True,
+            "query": {"bool": {"filter": filters}},
+            "sort": [{"originalNumber": "asc"}],
+        }
+
+
+def _letter_regexp(value):
+    value = _slot_value(value).upper()
+    return '[A-Z]' if value in (ANY, DIGIT) else value
+
+
+def compile_pattern(name, pattern):
+    return CompiledPattern(get_format(name), pattern)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Count and list the plates matching a slot pattern without touching Elasticsearch")
+    parser.add_argument("format", help=f"plate format: {', '.join(FORMATS)}")
+    parser.add_argument("pattern", help="comma-separated slot values, e.g. 'A,*,-,,B,,'")
+    parser.add_argument("--page", type=int, default=0)
+    parser.add_argument("--size", type=int, default=20)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    compiled = compile_pattern(args.format, args.pattern.split(','))
+    print(f"{compiled.count} plates match (ES regexp: {compiled.regexp()})")
+    for document in compiled.documents(args.page, args.size):
+        print(f"  {document['plateNumber']}  £{document['price']:,.2f}")
+
+
+if __name__ == "__main__":
+    main()
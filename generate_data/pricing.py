@@ -0,0 +1,63 @@
+import zlib
+import numpy as np
+
+PRICING_SEED = 0x5EED  # 改变种子会整体改变所有车牌的价格
+MIN_PRICE, MAX_PRICE = 500, 5000
+MAX_DISCOUNT = 50
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN = 0x9E3779B97F4A7C15
+_MUL1 = 0xBF58476D1CE4E5B9
+_MUL2 = 0x94D049BB133111EB
+
+# 价格和折扣分别取自两个独立的哈希流
+_PRICE_STREAM = 1
+_DISCOUNT_STREAM = 2
+
+
+def _mix64(z):
+    # splitmix64 的末尾混合函数（Python 整数版）
+    z = ((z ^ (z >> 30)) * _MUL1) & _MASK64
+    z = ((z ^ (z >> 27)) * _MUL2) & _MASK64
+    return z ^ (z >> 31)
+
+
+def _mix64_array(z):
+    # 与 _mix64 相同，uint64 数组上的乘法溢出即按 2**64 取模
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(_MUL1)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(_MUL2)
+    return z ^ (z >> np.uint64(31))
+
+
+def format_key(name, seed=PRICING_SEED):
+    # 用 crc32 而不是 hash()，保证不同进程、不同次运行得到相同的键
+    return _mix64(((seed & 0xFFFFFFFF) << 32) | zlib.crc32(name.encode()))
+
+
+def _unit(h):
+    return (h >> 11) * 2.0 ** -53  # 取高 53 位映射到 [0, 1)
+
+
+def _round_cents(value):
+    # 与 np.round(x, 2) 相同的舍入方式，保证逐条和整块生成的结果一致
+    return round(value * 100) / 100
+
+
+def plate_price(name, ordinal, seed=PRICING_SEED):
+    # 价格只由 (种子, 格式, 序号) 决定，任何进程、任何重放都得到相同的值
+    key = format_key(name, seed)
+    price_hash = _mix64((key + (2 * ordinal + _PRICE_STREAM) * _GOLDEN) & _MASK64)
+    discount_hash = _mix64((key + (2 * ordinal + _DISCOUNT_STREAM) * _GOLDEN) & _MASK64)
+    price = MIN_PRICE + (MAX_PRICE - MIN_PRICE) * _unit(price_hash)
+    discount = MAX_DISCOUNT * _unit(discount_hash)
+    return _round_cents(price), _round_cents(discount)
+
+
+def block_prices(name, ordinals, seed=PRICING_SEED):
+    key = np.uint64(format_key(name, seed))
+    ordinals = ordinals.astype(np.uint64) * np.uint64(2)
+    price_hash = _mix64_array(key + (ordinals + np.uint64(_PRICE_STREAM)) * np.uint64(_GOLDEN))
+    discount_hash = _mix64_array(key + (ordinals + np.uint64(_DISCOUNT_STREAM)) * np.uint64(_GOLDEN))
+    price = MIN_PRICE + (MAX_PRICE - MIN_PRICE) * ((price_hash >> np.uint64(11)) * 2.0 ** -53)
+    discount = MAX_DISCOUNT * ((discount_hash >> np.uint64(11)) * 2.0 ** -53)
+    return np.round(price, 2), np.round(discount, 2)
@@ -1,57 +1,62 @@
-import numpy as np
-
-# 相似度矩阵
-similarity_pairs = {
-    ('A', '4'): 0.8,
-    ('B', '8'): 0.9, ('B', '3'): 0.6,
-    ('D', 'O'): 0.8, ('D', '0'): 0.8,
-    ('E', '3'): 0.7,
-    ('G', '6'): 0.8, ('C', 'G'): 0.5,
-    ('I', '1'): 0.95, ('I', 'L'): 0.6,
-    ('O', '0'): 0.9, ('O', 'Q'): 0.7,
-    ('S', '5'): 0.9,
-    ('Z', '2'): 0.85,
-    ('T', '7'): 0.85,
-    ('L', '1'): 0.85,
-    ('P', 'R'): 0.6,
-    ('U', 'V'): 0.75,
-    ('V', 'Y'): 0.5,
-    ('M', 'N'): 0.6,
-    ('K', 'X'): 0.5,
-}
-
-def get_similarity(c1, c2):
-    if c1 == c2:
-        return 1.0
-    if (c1, c2) in similarity_pairs:
-        return similarity_pairs[(c1, c2)]
-    if (c2, c1) in similarity_pairs:
-        return similarity_pairs[(c2, c1)]
-    return 0.0
+import heapq
+from functools import lru_cache
+from confusion_model import SIMILAR_CHARS, get_similarity
+
+INF = float('inf')
+
+class LevenshteinAutomaton:
+    # 针对一个查询编译一次，之后对每个候选复用：
+    # 每个查询字符预先算好与相似字符的替换代价，DP 只计算 |i - j| <= max_dist 的对角带，
+    # 一旦连续两行（交换操作会跨两行）带内的值全部超过上限就立即放弃该候选
+    def __init__(self, query, max_dist=3):
+        self.query = query
+        self.max_dist = max_dist
+        self.sub_costs = []
+        for qc in query:
+            costs = {c: 1 - similarity for c, similarity in SIMILAR_CHARS.get(qc, {}).items()}
+            costs[qc] = 0.0
+            self.sub_costs.append(costs)
+
+    def distance(self, candidate, max_dist=None):
+        # max_dist 可以临时收紧（例如 top-k 时用当前第 k 名的分数作为上限）
+        bound = self.max_dist if max_dist is None else max_dist
+        query = self.query
+        len1, len2 = len(query), len(candidate)
+        if abs(len1 - len2) > bound:
+            return INF  # 长度差本身就超过上限
+        band = int(bound)  # 插入/删除代价为 1，带外的格子代价必然超过上限
+
+        prev2 = None
+        prev = [j if j <= band else INF for j in range(len2 + 1)]
+        prev_min = 0
+        for i in range(1, len1 + 1):
+            cur = [INF] * (len2 + 1)
+            if i <= band:
+                cur[0] = i
+            costs = self.sub_costs[i - 1]
+            row_min = cur[0]
+            for j in range(max(1, i - band), min(len2, i + band) + 1):
+                c = candidate[j - 1]
+                d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + costs.get(c, 1.0))  # 删除、插入、替换
+                if i > 1 and j > 1 and query[i - 1] == candidate[j - 2] and query[i - 2] == c:
+                    d = min(d, prev2[j - 2] + 1)  # 交换
+                cur[j] = d
+                if d < row_min:
+                    row_min = d
+            if row_min > bound and prev_min > bound:
+                return INF  # 提前截断
+            prev2, prev, prev_min = prev, cur, row_min
+
+        final_distance = prev[len2]
+        return final_distance if final_distance <= bound else INF
+
+@lru_cache(maxsize=256)
+def compile_levenshtein_automaton(query, max_dist=3):
+    return LevenshteinAutomaton(query, max_dist)
 
 def custom_levenshtein_automaton(str1, str2, max_dist=3):
-    len1, len2 = len(str1), len(str2)
-    dp = np.full((len1 + 1, len2 + 1), float('inf'))  # 用inf初始化矩阵
-    dp[0][0] = 0  # 初始状态
-
-    for i in range(len1 + 1):
-        for j in range(len2 + 1):
-            if i > 0:
-                dp[i][j] = min(dp[i][j], dp[i - 1][j] + 1)  # 删除
-            if j > 0:
-                dp[i][j] = min(dp[i][j], dp[i][j - 1] + 1)  # 插入
-            if i > 0 and j > 0:
-                cost_substitution = 1 - get_similarity(str1[i - 1], str2[j - 1])
-                dp[i][j] = min(dp[i][j], dp[i - 1][j - 1] + cost_substitution)  # 替换
-            if i > 1 and j > 1 and str1[i - 1] == str2[j - 2] and str1[i - 2] == str2[j - 1]:
-                dp[i][j] = min(dp[i][j], dp[i - 2][j - 2] + 1)  # 交换
-
-    final_distance = dp[len1][len2]
-    
-    if final_distance > max_dist:
-        return float('inf')
-    
-    return final_distance
+    # 同一个查询的自动机会被缓存，对一批候选打分时只编译一次
+    return compile_levenshtein_automaton(str1, max_dist).distance(str2)
 
 def adjusted_jaccard_similarity(str1, str2, similarity_threshold=0.5):
     set1 = set(str1)
@@ -101,26 +106,59 @@ def sort_distances(distances, reverse=True):
     sorted_distances = sorted(distances.items(), key=lambda item: item[1], reverse=reverse)
     return sorted_distances
 
-# 示例用法
-input_str = "MARK"
-database = {
-    "record1": "M4 ARK",
-    "record2": "M2 ARK",
-    "record3": "4B12 CDE",
-    "record4": "4B1C PPP",
-    "record44": "4B1 GPP",
-    "record445": "M4 CRK",
-    "record5": "M4 KRK",
-    "record6": "M4 BRK",
-}
-
-# 控制 Levenshtein 和 Jaccard 的相对重要性
-alpha = 0.7  # Levenshtein 的权重
-beta = 0.3   # Jaccard 的权重
-
-distances = calculate_mixed_distances(input_str, database, alpha, beta)
-sorted_distances = sort_distances(distances)
-
-# 输出排序后的结果
-for key, similarity in sorted_distances:
-    print(f"Similarity between '{input_str}' and '{database[key]}' (record '{key}'): {similarity}")
+def top_k_mixed(input_str, candidates, k=20, alpha=0.5, beta=0.5, similarity_threshold=0.5, max_dist=3):
+    # 流式版本的 calculate_mixed_distances + sort_distances：
+    # candidates 是 (key, record) 的迭代器，只保留 k 个最高分，内存与候选数量无关。
+    # 堆满后，第 k 名的分数换算成距离上限传给自动机，注定进不了前 k 的候选会被提前截断
+    automaton = compile_levenshtein_automaton(input_str, max_dist)
+    heap = []  # 小顶堆：(分数, -序号, key)，堆顶是当前第 k 名；同分时后来的先被挤出，与稳定排序一致
+    for n, (key, record) in enumerate(candidates):
+        jaccard_sim = adjusted_jaccard_similarity(input_str, record, similarity_threshold) if beta else 0.0
+        bound = max_dist
+        if len(heap) == k and alpha > 0:
+            # 需要 alpha / (1 + d) + beta * jaccard > 第 k 名的分数
+            needed = heap[0][0] - beta * jaccard_sim
+            if needed >= alpha:
+                continue  # 距离为 0 也追不上
+            if needed > 0:
+                bound = min(max_dist, alpha / needed - 1 + 1e-9)
+
+        dl_distance = automaton.distance(record, bound)
+        if dl_distance == INF:
+            if len(heap) == k:
+                continue
+            score = 0.0  # 与 mixed_similarity 一致：超过上限的候选得 0 分
+        else:
+            score = alpha / (1 + dl_distance) + beta * jaccard_sim
+
+        if len(heap) < k:
+            heapq.heappush(heap, (score, -n, key))
+        elif score > heap[0][0]:
+            heapq.heapreplace(heap, (score, -n, key))
+
+    return [(key, score) for score, _, key in sorted(heap, key=lambda item: (-item[0], -item[1]))]
+
+if __name__ == "__main__":
+    # 示例用法
+    input_str = "MARK"
+    database = {
+        "record1": "M4 ARK",
+        "record2": "M2 ARK",
+        "record3": "4B12 CDE",
+        "record4": "4B1C PPP",
+        "record44": "4B1 GPP",
+        "record445": "M4 CRK",
+        "record5": "M4 KRK",
+        "record6": "M4 BRK",
+    }
+
+    # 控制 Levenshtein 和 Jaccard 的相对重要性
+    alpha = 0.7  # Levenshtein 的权重
+    beta = 0.3   # Jaccard 的权重
+
+    distances = calculate_mixed_distances(input_str, database, alpha, beta)
+    sorted_distances = sort_distances(distances)
+
+    # 输出排序后的结果
+    for key, similarity in sorted_distances:
+        print(f"Similarity between '{input_str}' and '{database[key]}' (record '{key}'): {similarity}")
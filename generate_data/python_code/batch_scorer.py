@@ -0,0 +1,159 @@
+from functools import lru_cache
+import numpy as np
+from confusion_model import CHARS, CHAR_CODES, SIMILARITY, SUB_COST  # 字符编码、36×36 相似度与替换代价矩阵
+
+PLATE_WIDTH = 8  # 车牌去掉空格后最多 8 个字符
+
+
+def encode_plate(plate):
+    # 空格不参与比较（与 originalNumber 一致），其余字符必须在字符集内
+    try:
+        return np.array([CHAR_CODES[c] for c in plate.upper() if c != ' '], dtype=np.uint8)
+    except KeyError as e:
+        raise ValueError(f"{plate!r} contains unsupported character {e.args[0]!r}") from None
+
+
+def encode_plates(plates, width=PLATE_WIDTH):
+    # 编码成 [n, width] 的 uint8 矩阵，右侧补 0；长度单独保存
+    codes = np.zeros((len(plates), width), dtype=np.uint8)
+    lengths = np.zeros(len(plates), dtype=np.uint8)
+    for i, plate in enumerate(plates):
+        encoded = encode_plate(plate)
+        if len(encoded) > width:
+            raise ValueError(f"{plate!r} is longer than {width} characters")
+        codes[i, :len(encoded)] = encoded
+        lengths[i] = len(encoded)
+    return codes, lengths
+
+
+def encode_ordinals(layout, start=0, stop=None, width=PLATE_WIDTH):
+    # 直接按序号整段编码，不生成车牌字符串：与 plate_blocks.generate_block 一样用混合进制拆出
+    # 头部、数字、尾部下标，字母下标即编码（CHARS 以 A-Z 开头），数字部分查表后按长度错位写入
+    stop = layout.size if stop is None else min(stop, layout.size)
+    ordinals = np.arange(start, stop, dtype=np.int64)
+    rest, tail = np.divmod(ordinals, layout.tail_size)
+    head, number = np.divmod(rest, len(layout.numbers))
+    digits = [[CHAR_CODES[c] for c in str(n)] for n in layout.numbers]
+    number_len = max(len(d) for d in digits)
+    if layout.head_len + number_len + layout.tail_len > width:
+        raise ValueError(f"{layout.name} plates are longer than {width} characters")
+    number_codes = np.zeros((len(digits), number_len), dtype=np.uint8)
+    for i, d in enumerate(digits):
+        number_codes[i, :len(d)] = d
+    number_lengths = np.array([len(d) for d in digits], dtype=np.uint8)[number]
+
+    codes = np.zeros((len(ordinals), width), dtype=np.uint8)
+    for p in range(layout.head_len):
+        codes[:, p] = head // 26 ** (layout.head_len - 1 - p) % 26
+    codes[:, layout.head_len:layout.head_len + number_len] = number_codes[number]
+    rows = np.arange(len(ordinals))
+    tail_start = layout.head_len + number_lengths.astype(np.int64)
+    for p in range(layout.tail_len):
+        # 数字位数不足时尾部左移，覆盖掉上面写入的补位 0（长度之后的位置保持为 0，与 encode_plates 一致）
+        codes[rows, tail_start + p] = tail // 26 ** (layout.tail_len - 1 - p) % 26
+    return codes, (layout.head_len + number_lengths + layout.tail_len).astype(np.uint8)
+
+
+def batch_damerau_levenshtein(query, codes, lengths):
+    # 与 custom_damerau_levenshtein 相同的加权 DP，但一行一行地对所有候选同时计算：
+    # 外层循环只有 len(query) × width 次，每次都是长度为 n 的向量运算
+    q = encode_plate(query)
+    n, width = codes.shape
+    rows = np.arange(n)
+    prev = np.tile(np.arange(width + 1, dtype=np.float32), (n, 1))
+    if len(q) == 0:
+        return prev[rows, lengths]
+
+    matches = [codes == c for c in q]  # 交换操作需要的逐字符相等掩码
+    prev2 = None
+    for i in range(1, len(q) + 1):
+        cur = np.empty_like(prev)
+        cur[:, 0] = i
+        sub = SUB_COST[q[i - 1]][codes]  # [n, width] 一次查表得到整行替换代价
+        best = np.minimum(prev[:, :-1] + sub, prev[:, 1:] + 1)  # 替换、删除
+        for j in range(1, width + 1):
+            cur[:, j] = np.minimum(best[:, j - 1], cur[:, j - 1] + 1)  # 插入
+            if i > 1 and j > 1:
+                swap = matches[i - 2][:, j - 1] & matches[i - 1][:, j - 2]
+                np.minimum(cur[:, j], prev2[:, j - 2] + 1, out=cur[:, j], where=swap)  # 交换
+        prev2, prev = prev, cur
+    return prev[rows, lengths]
+
+
+def batch_dl_similarity(query, codes, lengths):
+    # 与 mixed_similarity 中的换算一致：1 - 距离 / 较长的长度
+    distances = batch_damerau_levenshtein(query, codes, lengths)
+    max_len = np.maximum(lengths, len(encode_plate(query))).astype(np.float32)
+    return 1 - distances / np.maximum(max_len, 1)
+
+
+def iter_chunks(codes, lengths, chunk_size=1_000_000):
+    # 对整个格式打分时分块计算，控制 DP 中间矩阵的内存
+    for start in range(0, len(codes), chunk_size):
+        yield start, codes[start:start + chunk_size], lengths[start:start + chunk_size]
+
+
+# 调整后的 Jaccard 相似度：每个车牌的字符集合用一个 36 位掩码表示
+MASK_BYTES = (len(CHARS) + 7) // 8  # 36 位掩码按字节拆成 5 段查表
+POPCOUNT8 = np.array([bin(b).count('1') for b in range(256)], dtype=np.uint8)
+
+
+def plate_masks(codes, lengths):
+    # 每个车牌的字符出现掩码：第 i 位表示 CHARS[i] 出现过
+    valid = np.arange(codes.shape[1]) < lengths[:, None]
+    bits = np.where(valid, np.left_shift(np.uint64(1), codes.astype(np.uint64)), np.uint64(0))
+    return np.bitwise_or.reduce(bits, axis=1)
+
+
+@lru_cache(maxsize=16)
+def neighbour_masks(similarity_threshold=0.5):
+    # 每个字符的「形近字符」掩码：相似度超过阈值的字符（包括自身）
+    neighbours = SIMILARITY > similarity_threshold
+    return (neighbours.astype(np.uint64) << np.arange(len(CHARS), dtype=np.uint64)).sum(axis=1, dtype=np.uint64)
+
+
+def _byte_tables(weights):
+    # 把每个字符的权重按所在字节展开成 [MASK_BYTES, 256] 表：表[b][v] = 第 b 个字节取值 v 时置位字符的权重之和
+    padded = np.zeros(MASK_BYTES * 8, dtype=np.float64)
+    padded[:len(weights)] = weights
+    bits = (np.arange(256)[:, None] >> np.arange(8)) & 1  # [256, 8]
+    return np.stack([bits @ padded[b * 8:(b + 1) * 8] for b in range(MASK_BYTES)])
+
+
+def _lookup(tables, masks):
+    total = np.zeros(len(masks), dtype=tables.dtype)
+    for b in range(MASK_BYTES):
+        total += tables[b][(masks >> np.uint64(8 * b)) & np.uint64(0xFF)]
+    return total
+
+
+def popcount(masks):
+    total = np.zeros(len(masks), dtype=np.int64)
+    for b in range(MASK_BYTES):
+        total += POPCOUNT8[(masks >> np.uint64(8 * b)) & np.uint64(0xFF)]
+    return total
+
+
+def batch_adjusted_jaccard(query, masks, similarity_threshold=0.5):
+    # 与 adjusted_jaccard_similarity 相同：交集为所有相似字符对的相似度之和，
+    # 并集为两个集合大小之和减去相似字符对的个数。
+    # 查询固定后，候选中每个字符贡献的 (相似度之和, 配对数) 只取决于该字符本身，
+    # 于是两者都能按掩码的字节查表累加，整批候选只需几次向量化查表
+    query_chars = np.unique(encode_plate(query))
+    # similar[i, c]：候选字符 c 是否在第 i 个查询字符的形近掩码里
+    neighbours = neighbour_masks(similarity_threshold)[query_chars]
+    similar = (neighbours[:, None] >> np.arange(len(CHARS), dtype=np.uint64)) & np.uint64(1)
+    weights = (similar * SIMILARITY[query_chars]).sum(axis=0)
+    pairs = similar.sum(axis=0)
+
+    intersection = _lookup(_byte_tables(weights), masks)
+    union = len(query_chars) + popcount(masks) - _lookup(_byte_tables(pairs), masks)
+    return np.divide(intersection, union, out=np.zeros(len(masks)), where=union != 0).astype(np.float32)
+
+
+def batch_mixed_similarity(query, codes, lengths, masks=None, alpha=0.5, beta=0.5, similarity_threshold=0.5):
+    # none_ngram.mixed_similarity 的批量版本
+    if masks is None:
+        masks = plate_masks(codes, lengths)
+    dl_similarity = batch_dl_similarity(query, codes, lengths)
+    return alpha * dl_similarity + beta * batch_adjusted_jaccard(query, masks, similarity_threshold)
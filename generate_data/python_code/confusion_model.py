@@ -0,0 +1,100 @@
+import numpy as np
+
+# 形近字符模型：所有打分器和 ES 分析器共用的唯一来源。
+# 相似度表在导入时编译成三种形式：
+#   SIMILARITY / SUB_COST：36×36 稠密矩阵（向量化打分、编辑距离代价）
+#   SIMILAR_CHARS：{字符: {形近字符: 相似度}}（逐字符的 Python 打分）
+#   CHAR_CLASSES / CHAR_FILTER_MAPPINGS：归一类别及对应的 ES mapping char_filter
+# 修改相似度表后需要重建索引，ES 中的归一规则才会生效
+
+# 字符集：26个字母 + 10个数字，编码即在此字符串中的下标
+CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+CHAR_CODES = {c: i for i, c in enumerate(CHARS)}
+
+# 相似度矩阵
+SIMILARITY_PAIRS = {
+    ('A', '4'): 0.8,
+    ('B', '8'): 0.9, ('B', '3'): 0.6,
+    ('D', 'O'): 0.8, ('D', '0'): 0.8,
+    ('E', '3'): 0.7,
+    ('G', '6'): 0.8, ('C', 'G'): 0.5,
+    ('I', '1'): 0.95, ('I', 'L'): 0.6,
+    ('O', '0'): 0.9, ('O', 'Q'): 0.7,
+    ('S', '5'): 0.9,
+    ('Z', '2'): 0.85,
+    ('T', '7'): 0.85,
+    ('L', '1'): 0.85,
+    ('P', 'R'): 0.6,
+    ('U', 'V'): 0.75,
+    ('V', 'Y'): 0.5,
+    ('M', 'N'): 0.6,
+    ('K', 'X'): 0.5,
+}
+
+# 两两相似度都不低于该值的字符归入同一类，ES 中映射成同一个符号
+CLASS_THRESHOLD = 0.6
+CLASS_SYMBOLS = "αβγδεζηθικλμνξοπρστυφχψω"  # 按类别中第一个字符在 CHARS 中的顺序依次分配
+
+
+def _compile_similarity(pairs):
+    similarity = np.eye(len(CHARS))
+    for (c1, c2), value in pairs.items():
+        similarity[CHAR_CODES[c1], CHAR_CODES[c2]] = similarity[CHAR_CODES[c2], CHAR_CODES[c1]] = value
+    return similarity
+
+
+def _compile_classes(pairs, threshold):
+    # 全连接聚类：按相似度从高到低合并，只有两类之间每一对字符的相似度都不低于阈值时才合并。
+    # 同一类里任意两个字符在打分器中都是形近的（不会像传递闭包那样经 3 把 B 和 E 连在一起）
+    similarity = _compile_similarity(pairs)
+    group = {i: {i} for i in range(len(CHARS))}  # 字符下标 -> 所在类（同一类共享一个集合）
+    for (c1, c2), value in sorted(pairs.items(), key=lambda item: -item[1]):
+        if value < threshold:
+            break
+        g1, g2 = group[CHAR_CODES[c1]], group[CHAR_CODES[c2]]
+        if g1 is g2 or any(similarity[i, j] < threshold for i in g1 for j in g2):
+            continue
+        g1 |= g2
+        for j in g2:
+            group[j] = g1
+
+    # 按类中第一个字符在 CHARS 中的顺序排列；只有一个字符的类不需要归一
+    classes = []
+    for i in range(len(CHARS)):
+        members = sorted(group[i])
+        if members[0] == i and len(members) > 1:
+            classes.append([CHARS[j] for j in members])
+    if len(classes) > len(CLASS_SYMBOLS):
+        raise ValueError(f"{len(classes)} confusion classes but only {len(CLASS_SYMBOLS)} symbols")
+    return {c: CLASS_SYMBOLS[k] for k, chars in enumerate(classes) for c in chars}
+
+
+SIMILARITY = _compile_similarity(SIMILARITY_PAIRS)  # float64，对角线为 1
+SUB_COST = (1 - SIMILARITY).astype(np.float32)  # 替换代价，同一字符为 0
+SIMILAR_CHARS = {
+    c: {CHARS[j]: float(SIMILARITY[i, j]) for j in np.flatnonzero(SIMILARITY[i])}
+    for c, i in CHAR_CODES.items()
+}
+
+CHAR_CLASSES = _compile_classes(SIMILARITY_PAIRS, CLASS_THRESHOLD)  # 字符 -> 类别符号
+CANONICAL_TABLE = str.maketrans(CHAR_CLASSES)
+CHAR_FILTER_MAPPINGS = [f"{c} => {symbol}" for c, symbol in CHAR_CLASSES.items()]
+
+
+def get_similarity(c1, c2):
+    if c1 == c2:
+        return 1.0
+    return SIMILAR_CHARS.get(c1, {}).get(c2, 0.0)
+
+
+def canonicalize(text):
+    # 与 character_replacement_filter 相同的归一（不做去空格、去数字等其他处理）
+    return text.upper().translate(CANONICAL_TABLE)
+
+
+if __name__ == "__main__":
+    classes = {}
+    for c, symbol in CHAR_CLASSES.items():
+        classes.setdefault(symbol, []).append(c)
+    for symbol, chars in classes.items():
+        print(f"{symbol}: {' '.join(chars)}")
@@ -1,60 +1,77 @@
 import numpy as np
-from sklearn.neighbors import NearestNeighbors
+from confusion_model import CHARS, CHAR_CODES, SIMILARITY
 
 # 字符集：26个字母 + 10个数字
-chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
-
-# 相似度字典，使用提供的相似度矩阵
-char_similarity = {
-    ('A', '4'): 0.8, ('B', '8'): 0.9, ('B', '3'): 0.6,
-    ('D', 'O'): 0.8, ('D', '0'): 0.8, ('E', '3'): 0.7,
-    ('G', '6'): 0.8, ('C', 'G'): 0.5, ('I', '1'): 0.95,
-    ('I', 'L'): 0.6, ('O', '0'): 0.9, ('O', 'Q'): 0.7,
-    ('S', '5'): 0.9, ('Z', '2'): 0.85, ('T', '7'): 0.85,
-    ('L', '1'): 0.85, ('P', 'R'): 0.6, ('U', 'V'): 0.75,
-    ('V', 'Y'): 0.5, ('M', 'N'): 0.6, ('K', 'X'): 0.5
-}
-
-# 构建字符的相似度向量，未知字符相似度设为0
+chars = CHARS
+
+# 构建字符的相似度向量（即相似度矩阵的一行），未知字符相似度设为0
 def build_char_vector(char):
-    vector = np.zeros(len(chars))
-    for i, c in enumerate(chars):
-        if char == c:
-            vector[i] = 1.0  # 自己和自己相似度为1
-        else:
-            vector[i] = char_similarity.get((char, c), char_similarity.get((c, char), 0))
-    return vector
+    i = CHAR_CODES.get(char)
+    return SIMILARITY[i].copy() if i is not None else np.zeros(len(chars))
+
+# 36×36 字符嵌入表：第 i 行即 build_char_vector(chars[i])；最后追加一行全 0，给空格等未知字符用
+CHAR_EMBEDDINGS = np.vstack([SIMILARITY, np.zeros(len(chars))]).astype(np.float32)
+UNKNOWN_CODE = len(chars)
+BLOCK_SIZE = 4096  # 分块矩阵乘法每块的行数
 
 # 将车牌转换为特征向量
 def plate_to_vector(plate):
     vectors = [build_char_vector(c) for c in plate]
     return np.concatenate(vectors)
 
+# 一次性把所有车牌编码成 [n, width*36] 的 float32 矩阵，每行已归一化；
+# 较短的车牌在末尾补全 0 的位置，不影响点积和范数
+def encode_plates(plates, width=None):
+    width = width or max((len(plate) for plate in plates), default=0)
+    codes = np.full((len(plates), width), UNKNOWN_CODE, dtype=np.uint8)
+    for i, plate in enumerate(plates):
+        codes[i, :len(plate)] = [CHAR_CODES.get(c, UNKNOWN_CODE) for c in plate]
+    vectors = CHAR_EMBEDDINGS[codes].reshape(len(plates), -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
 # 计算两个车牌的相似度，使用余弦相似度
 def plate_similarity(plate1, plate2):
-    vec1 = plate_to_vector(plate1)
-    vec2 = plate_to_vector(plate2)
-    return np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2))
+    vec1, vec2 = encode_plates([plate1, plate2])
+    return float(np.dot(vec1, vec2))
 
-# 计算所有样本之间的相似度距离矩阵
-def compute_similarity_matrix(plates):
+# 按块产出相似度：(行起点, 列起点, 块)，只计算上三角的块，下三角由对称性得到
+def iter_similarity_blocks(vectors, block_size=BLOCK_SIZE):
+    n = len(vectors)
+    for i in range(0, n, block_size):
+        rows = vectors[i:i + block_size]
+        for j in range(i, n, block_size):
+            yield i, j, rows @ vectors[j:j + block_size].T
+
+# 计算所有样本之间的相似度距离矩阵；out 为文件路径时结果直接写入 np.memmap，
+# 矩阵不必整个放在内存里（n 为几十万时需要的是磁盘空间：n*n*4 字节）
+def compute_similarity_matrix(plates, block_size=BLOCK_SIZE, out=None):
+    vectors = encode_plates(plates)
     n = len(plates)
-    similarity_matrix = np.zeros((n, n))
-    
-    for i in range(n):
-        for j in range(n):
-            similarity_matrix[i][j] = plate_similarity(plates[i], plates[j])
-    
+    if out is None:
+        similarity_matrix = np.empty((n, n), dtype=np.float32)
+    else:
+        similarity_matrix = np.lib.format.open_memmap(out, mode='w+', dtype=np.float32, shape=(n, n))
+
+    for i, j, block in iter_similarity_blocks(vectors, block_size):
+        similarity_matrix[i:i + block.shape[0], j:j + block.shape[1]] = block
+        if i != j:
+            similarity_matrix[j:j + block.shape[1], i:i + block.shape[0]] = block.T
+
+    if out is not None:
+        similarity_matrix.flush()
     return similarity_matrix
 
-# 车牌数据
-plates = ['AB1234', 'AB123A', 'A8123A', 'EF1236']
+if __name__ == "__main__":
+    # 车牌数据
+    plates = ['AB1234', 'AB123A', 'A8123A', 'EF1236']
 
-# 计算样本车牌之间的相似度矩阵
-similarity_matrix = compute_similarity_matrix(plates)
+    # 计算样本车牌之间的相似度矩阵
+    similarity_matrix = compute_similarity_matrix(plates)
 
-# 打印相似度矩阵
-print("车牌相似度矩阵：")
-for i, plate1 in enumerate(plates):
-    for j, plate2 in enumerate(plates):
-        print(f"{plate1} 和 {plate2} 的相似度: {similarity_matrix[i][j]:.2f}")
+    # 打印相似度矩阵
+    print("车牌相似度矩阵：")
+    for i, plate1 in enumerate(plates):
+        for j, plate2 in enumerate(plates):
+            print(f"{plate1} 和 {plate2} 的相似度: {similarity_matrix[i][j]:.2f}")
@@ -0,0 +1,11 @@
+import importlib
+
+# 13.py 的文件名不能直接 import，只在这里按模块名加载一次，其他模块都从本模块导入
+_mixed = importlib.import_module("13")
+
+LevenshteinAutomaton = _mixed.LevenshteinAutomaton
+compile_levenshtein_automaton = _mixed.compile_levenshtein_automaton
+custom_levenshtein_automaton = _mixed.custom_levenshtein_automaton
+adjusted_jaccard_similarity = _mixed.adjusted_jaccard_similarity
+mixed_similarity = _mixed.mixed_similarity
+top_k_mixed = _mixed.top_k_mixed
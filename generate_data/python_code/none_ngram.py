@@ -1,33 +1,5 @@
 import numpy as np
-
-# 相似度矩阵
-similarity_pairs = {
-    ('A', '4'): 0.8,
-    ('B', '8'): 0.9, ('B', '3'): 0.6,
-    ('D', 'O'): 0.8, ('D', '0'): 0.8,
-    ('E', '3'): 0.7,
-    ('G', '6'): 0.8, ('C', 'G'): 0.5,
-    ('I', '1'): 0.95, ('I', 'L'): 0.6,
-    ('O', '0'): 0.9, ('O', 'Q'): 0.7,
-    ('S', '5'): 0.9,
-    ('Z', '2'): 0.85,
-    ('T', '7'): 0.85,
-    ('L', '1'): 0.85,
-    ('P', 'R'): 0.6,
-    ('U', 'V'): 0.75,
-    ('V', 'Y'): 0.5,
-    ('M', 'N'): 0.6,
-    ('K', 'X'): 0.5,
-}
-
-def get_similarity(c1, c2):
-    if c1 == c2:
-        return 1.0
-    if (c1, c2) in similarity_pairs:
-        return similarity_pairs[(c1, c2)]
-    if (c2, c1) in similarity_pairs:
-        return similarity_pairs[(c2, c1)]
-    return 0.0
+from confusion_model import get_similarity
 
 def custom_damerau_levenshtein(str1, str2):
     len1, len2 = len(str1), len(str2)
@@ -95,26 +67,27 @@ def sort_distances(distances, reverse=True):
     sorted_distances = sorted(distances.items(), key=lambda item: item[1], reverse=reverse)
     return sorted_distances
 
-# 示例用法
-input_str = "MARK"
-database = {
-    "record1": "M4 ARK",
-    "record2": "M2 ARK",
-    "record3": "4B12 CDE",
-    "record4": "4B1C PPP",
-    "record44": "4B1 GPP",
-    "record445": "4B134 GPP",
-    "record5": "ABCD 123",
-    "record6": "4B12 GDA",
-}
-
-# 控制 Levenshtein 和 Jaccard 的相对重要性
-alpha = 0.8  # Levenshtein 的权重
-beta = 0.2   # Jaccard 的权重
-
-distances = calculate_mixed_distances(input_str, database, alpha, beta)
-sorted_distances = sort_distances(distances)
-
-# 输出排序后的结果
-for key, similarity in sorted_distances:
-    print(f"Similarity between '{input_str}' and '{database[key]}' (record '{key}'): {similarity}")
+if __name__ == "__main__":
+    # 示例用法
+    input_str = "MARK"
+    database = {
+        "record1": "M4 ARK",
+        "record2": "M2 ARK",
+        "record3": "4B12 CDE",
+        "record4": "4B1C PPP",
+        "record44": "4B1 GPP",
+        "record445": "4B134 GPP",
+        "record5": "ABCD 123",
+        "record6": "4B12 GDA",
+    }
+
+    # 控制 Levenshtein 和 Jaccard 的相对重要性
+    alpha = 0.8  # Levenshtein 的权重
+    beta = 0.2   # Jaccard 的权重
+
+    distances = calculate_mixed_distances(input_str, database, alpha, beta)
+    sorted_distances = sort_distances(distances)
+
+    # 输出排序后的结果
+    for key, similarity in sorted_distances:
+        print(f"Similarity between '{input_str}' and '{database[key]}' (record '{key}'): {similarity}")
@@ -0,0 +1,179 @@
+import heapq
+import operator
+import string
+from fuzzy import compile_levenshtein_automaton
+
+EPSILON = ''  # 空边：不消耗字符，用于把不同长度的数字段汇合到同一个后继节点
+
+
+class PlateTrie:
+    # 节点用下标表示，children[node] 是 {字符: 子节点}；同一后缀共享节点时即为 DAWG
+    def __init__(self):
+        self.children = [{}]
+        self.terminal = [False]
+        self._lengths = None  # 每个节点到终止节点的 (最短, 最长) 剩余长度，search 时按需计算
+        self.expanded = 0  # 最近一次 search 展开的状态数
+
+    def _new_node(self):
+        self.children.append({})
+        self.terminal.append(False)
+        self._lengths = None
+        return len(self.children) - 1
+
+    def add(self, plate):
+        node = 0
+        for c in plate.replace(' ', '').upper():
+            child = self.children[node].get(c)
+            if child is None:
+                child = self.children[node][c] = self._new_node()
+            node = child
+        self.terminal[node] = True
+        self._lengths = None
+
+    @classmethod
+    def from_plates(cls, plates):
+        trie = cls()
+        for plate in plates:
+            trie.add(plate)
+        return trie
+
+    @classmethod
+    def from_segments(cls, segments):
+        # 每一段是若干候选字符串（如 26 个字母、某格式的全部数字），段与段首尾相接。
+        # 整个格式的键空间因此只需要几十个节点，而不是按车牌数量展开
+        trie = cls()
+        start = 0
+        for alternatives in segments:
+            end = trie._new_node()
+            # 先插入较长的候选，保证较短候选的末字符落在已有的中间节点上时走空边
+            for alternative in sorted(alternatives, key=len, reverse=True):
+                node = start
+                for c in alternative[:-1]:
+                    child = trie.children[node].get(c)
+                    if child is None:
+                        child = trie.children[node][c] = trie._new_node()
+                    node = child
+                last = alternative[-1]
+                target = trie.children[node].get(last)
+                if target is None:
+                    trie.children[node][last] = end
+                elif target != end:
+                    # 该字符后面还接着更长的候选（如 "1" 与 "12"），用空边连到段尾
+                    trie.children[target][EPSILON] = end
+            start = end
+        trie.terminal[start] = True
+        return trie
+
+    def __len__(self):
+        return len(self.children)
+
+    def remaining_lengths(self):
+        # 字典树是无环图，按深度优先后序递推；走不到终止节点的节点最短长度为无穷大
+        if self._lengths is None:
+            lengths = [None] * len(self.children)
+
+            def visit(node):
+                if lengths[node] is None:
+                    shortest, longest = (0, 0) if self.terminal[node] else (float('inf'), float('-inf'))
+                    for c, child in self.children[node].items():
+                        step = 0 if c == EPSILON else 1
+                        child_shortest, child_longest = visit(child)
+                        shortest = min(shortest, child_shortest + step)
+                        longest = max(longest, child_longest + step)
+                    lengths[node] = (shortest, longest)
+                return lengths[node]
+
+            for node in range(len(self.children)):
+                visit(node)
+            self._lengths = lengths
+        return self._lengths
+
+    def search(self, query, k=20, max_dist=3):
+        # 用查询的加权编辑自动机遍历字典树，按下界优先展开；
+        # 凑满 k 个结果后，以第 k 名的距离作为新的上限剪枝：只有距离严格更小的结果才会替换第 k 名，
+        # 下界等于上限的状态不可能改变结果，不再展开。下界相同时先展开较深的状态，尽快凑满 k 个结果
+        automaton = compile_levenshtein_automaton(query, max_dist)
+        costs = automaton.sub_costs
+        query = automaton.query
+        n = len(query)
+        lengths = self.remaining_lengths()
+        gaps = {}  # 节点 -> (当前行各格的长度差, 上一行各格的长度差)
+
+        def lower_bound(node, row, prev_row):
+            # 行中每一格再加上剩余查询与剩余路径的长度差（每差一个字符至少一次插入或删除）；
+            # 交换会跨两行：从上一行出发的对齐还要多消耗当前节点之前的一个字符
+            node_gaps = gaps.get(node)
+            if node_gaps is None:
+                shortest, longest = lengths[node]
+                node_gaps = gaps[node] = tuple(
+                    [max(0, shortest + extra - (n - i), (n - i) - longest - extra) for i in range(n + 1)]
+                    for extra in (0, 1)
+                )
+            lower = min(map(operator.add, row, node_gaps[0]))
+            if prev_row is not None:
+                lower = min(lower, min(map(operator.add, prev_row, node_gaps[1])))
+            return lower
+
+        bound = max_dist
+        best = []  # 大顶堆：(-距离, 车牌)
+        first_row = list(range(n + 1))
+        frontier = [(0, 0, 0, 0, '', first_row, None)]  # (下界, -深度, 序号, 节点, 前缀, 当前行, 上一行)
+        counter = 1
+        self.expanded = 0
+        while frontier:
+            lower, _, _, node, prefix, row, prev_row = heapq.heappop(frontier)
+            if lower > bound or (lower == bound and len(best) == k):
+                break  # 剩下的状态下界都不小于它
+            self.expanded += 1
+
+            if self.terminal[node] and row[n] <= bound:
+                if len(best) < k:
+                    heapq.heappush(best, (-row[n], prefix))
+                elif row[n] < -best[0][0]:
+                    heapq.heapreplace(best, (-row[n], prefix))
+                if len(best) == k:
+                    bound = min(bound, -best[0][0])
+
+            for c, child in self.children[node].items():
+                if c == EPSILON:
+                    child_lower = lower_bound(child, row, prev_row)
+                    if child_lower < bound or (child_lower == bound and len(best) < k):
+                        heapq.heappush(frontier, (child_lower, -len(prefix), counter, child, prefix, row, prev_row))
+                        counter += 1
+                    continue
+                new_row = [row[0] + 1]
+                for i in range(1, n + 1):
+                    d = min(row[i] + 1, new_row[i - 1] + 1, row[i - 1] + costs[i - 1].get(c, 1.0))
+                    if prev_row is not None and i > 1 and query[i - 1] == prefix[-1] and query[i - 2] == c:
+                        d = min(d, prev_row[i - 2] + 1)  # 交换
+                    new_row.append(d)
+                child_lower = lower_bound(child, new_row, row)
+                if child_lower < bound or (child_lower == bound and len(best) < k):
+                    heapq.heappush(frontier, (child_lower, -len(prefix) - 1, counter, child, prefix + c, new_row, row))
+                    counter += 1
+
+        return sorted((-negative, plate) for negative, plate in best)
+
+
+def layout_segments(head_len, numbers, tail_len):
+    # 与 generate_data/plate_formats.py 中的 PlateLayout 对应：头部字母、数字、尾部字母
+    letters = list(string.ascii_uppercase)
+    return [letters] * head_len + [[str(number) for number in numbers]] + [letters] * tail_len
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    import time
+
+    # 在真实格式的完整键空间上计时，并统计展开的状态数
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+    from plate_formats import FORMATS
+
+    for layout in FORMATS.values():
+        trie = PlateTrie.from_segments(layout_segments(layout.head_len, layout.numbers, layout.tail_len))
+        for query in sys.argv[1:] or ["MARK", "BOSS", "AB12CDE"]:
+            started = time.perf_counter()
+            results = trie.search(query, 10)
+            print(f"[{layout.name}] {query}: {len(results)} results in {time.perf_counter() - started:.2f}s, "
+                  f"{trie.expanded} states expanded for {layout.size} plates")
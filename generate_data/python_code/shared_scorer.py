@@ -0,0 +1,172 @@
+import os
+from multiprocessing import Pool, shared_memory
+import numpy as np
+from batch_scorer import CHARS, PLATE_WIDTH, encode_ordinals, encode_plates, plate_masks, batch_mixed_similarity
+
+CHUNK_SIZE = 1_000_000  # 每个进程内再分块打分，控制 DP 中间矩阵的内存
+FIELDS = ("codes", "lengths", "masks")
+
+
+class SharedPlates:
+    # 编码后的车牌数组放在共享内存里：主进程创建一次，工作进程按名字挂载，不复制数据
+    def __init__(self, blocks, arrays, owner):
+        self.blocks = blocks
+        self.arrays = arrays
+        self.owner = owner
+
+    @classmethod
+    def allocate(cls, size, width=PLATE_WIDTH):
+        # 先分配空的共享数组，由调用方分块填入，避免整份数据在进程内再存一遍
+        shapes = {"codes": ((size, width), np.uint8), "lengths": ((size,), np.uint8), "masks": ((size,), np.uint64)}
+        blocks, arrays = {}, {}
+        for field in FIELDS:
+            shape, dtype = shapes[field]
+            block = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1))
+            arrays[field] = np.ndarray(shape, dtype, buffer=block.buf)
+            blocks[field] = block
+        return cls(blocks, arrays, owner=True)
+
+    @classmethod
+    def create(cls, codes, lengths, masks=None):
+        if masks is None:
+            masks = plate_masks(codes, lengths)
+        shared = cls.allocate(len(lengths), codes.shape[1])
+        for field, data in zip(FIELDS, (codes, lengths, masks)):
+            shared.arrays[field][...] = data
+        return shared
+
+    @classmethod
+    def from_layout(cls, layout, start=0, stop=None, block_size=CHUNK_SIZE):
+        # 按序号分块编码后直接写进共享内存，峰值内存只多一个块
+        stop = layout.size if stop is None else min(stop, layout.size)
+        shared = cls.allocate(stop - start)
+        for block_start in range(start, stop, block_size):
+            block_stop = min(block_start + block_size, stop)
+            codes, lengths = encode_ordinals(layout, block_start, block_stop)
+            rows = slice(block_start - start, block_stop - start)
+            shared.arrays["codes"][rows] = codes
+            shared.arrays["lengths"][rows] = lengths
+            shared.arrays["masks"][rows] = plate_masks(codes, lengths)
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        blocks, arrays = {}, {}
+        for field, (name, shape, dtype) in spec.items():
+            block = shared_memory.SharedMemory(name=name)
+            arrays[field] = np.ndarray(shape, dtype, buffer=block.buf)
+            blocks[field] = block
+        return cls(blocks, arrays, owner=False)
+
+    @property
+    def spec(self):
+        # 传给工作进程的只有名字、形状和类型
+        return {field: (self.blocks[field].name, a.shape, a.dtype.str) for field, a in self.arrays.items()}
+
+    def __len__(self):
+        return len(self.arrays["lengths"])
+
+    def close(self):
+        self.arrays = {}
+        for block in self.blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+        self.blocks = {}
+
+
+_shared = None  # 工作进程里挂载好的 SharedPlates
+
+
+def _attach(spec):
+    global _shared
+    _shared = SharedPlates.attach(spec)
+
+
+def top_k_indices(scores, k):
+    # argpartition 取前 k 个，再只对这 k 个排序
+    if len(scores) > k:
+        top = np.argpartition(scores, len(scores) - k)[len(scores) - k:]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def _score_shard(query, start, stop, k, alpha, beta, similarity_threshold):
+    codes, lengths, masks = (_shared.arrays[field] for field in FIELDS)
+    ids, scores = [], []
+    for chunk_start in range(start, stop, CHUNK_SIZE):
+        chunk = slice(chunk_start, min(chunk_start + CHUNK_SIZE, stop))
+        chunk_scores = batch_mixed_similarity(query, codes[chunk], lengths[chunk], masks[chunk], alpha, beta, similarity_threshold)
+        top = top_k_indices(chunk_scores, k)
+        ids.append(top + chunk_start)
+        scores.append(chunk_scores[top])
+    return np.concatenate(ids), np.concatenate(scores)
+
+
+class ShardedScorer:
+    # 每个工作进程负责一段连续的车牌，各自取前 k 名后在主进程合并；
+    # 每次查询只传查询串和分片边界，返回值也只有 k 个结果
+    def __init__(self, codes, lengths, masks=None, workers=None):
+        self._start(SharedPlates.create(codes, lengths, masks), workers)
+
+    def _start(self, shared, workers, start=0):
+        self.workers = workers or os.cpu_count()
+        self.shared = shared
+        self.start = start  # 第 i 个车牌在所属格式中的序号为 start + i（from_plates 时为 0）
+        self.pool = Pool(self.workers, initializer=_attach, initargs=(self.shared.spec,))
+        bounds = np.linspace(0, len(self.shared), self.workers + 1).astype(int)
+        self.shards = [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+    @classmethod
+    def from_plates(cls, plates, workers=None):
+        return cls(*encode_plates(plates), workers=workers)
+
+    @classmethod
+    def for_format(cls, layout, start=0, stop=None, workers=None):
+        # 整个格式（或序号区间 [start, stop)）直接由序号编码进共享内存，不经过车牌字符串
+        scorer = cls.__new__(cls)
+        scorer._start(SharedPlates.from_layout(layout, start, stop), workers, start)
+        return scorer
+
+    def top_k(self, query, k=20, alpha=0.5, beta=0.5, similarity_threshold=0.5):
+        # 返回 [(车牌下标, 分数), ...]，分数从高到低
+        results = self.pool.starmap(
+            _score_shard, [(query, start, stop, k, alpha, beta, similarity_threshold) for start, stop in self.shards],
+        )
+        if not results:
+            return []
+        ids = np.concatenate([shard_ids for shard_ids, _ in results])
+        scores = np.concatenate([shard_scores for _, shard_scores in results])
+        top = top_k_indices(scores, k)
+        return [(int(i), float(s)) for i, s in zip(ids[top], scores[top])]
+
+    def plate(self, i):
+        # 从共享的编码数组还原车牌（不含空格）
+        codes = self.shared.arrays["codes"][i, :self.shared.arrays["lengths"][i]]
+        return "".join(CHARS[c] for c in codes)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        self.shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    random.seed(0)
+    plates = ["".join(random.choice(CHARS) for _ in range(7)) for _ in range(2_000_000)]
+    with ShardedScorer.from_plates(plates) as scorer:
+        started = time.perf_counter()
+        results = scorer.top_k("AB12CDE", 10, alpha=0.7, beta=0.3)
+        print(f"{len(plates)} plates scored on {scorer.workers} workers in {time.perf_counter() - started:.2f}s")
+        for i, score in results:
+            print(f"{scorer.plate(i)}: {score:.4f}")
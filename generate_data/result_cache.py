@@ -0,0 +1,99 @@
+import json
+import time
+from collections import OrderedDict
+
+MAX_BYTES = 64 * 1024 * 1024  # 缓存结果的总大小上限（按 JSON 序列化后的字节数估算）
+TTL = 300.0  # 结果最多缓存 5 分钟，ES 中被其他途径修改的数据最终也会刷新
+
+
+def query_key(keyword):
+    # 查询的规范写法（去空格、大写），keyword_query 的各个子句和缓存键都用它。
+    # 不能按形近类归一：“M4RK”与“MARK”归一后相同，但精确和前缀命中的车牌完全不同
+    return ''.join(keyword.split()).upper()
+
+
+class CacheEntry:
+    __slots__ = ("value", "plates", "size", "expires")
+
+    def __init__(self, value, plates, size, expires):
+        self.value = value
+        self.plates = plates
+        self.size = size
+        self.expires = expires
+
+
+class ResultCache:
+    # LRU + TTL，按估算字节数限制总大小；另有 车牌 -> 键 的反向索引，
+    # 某个车牌的价格或可售状态变化时只失效包含它的结果。
+    # version 在每次失效时加一：查询前记下 version，写回时若已变化说明期间有更新，结果丢弃不缓存
+    def __init__(self, max_bytes=MAX_BYTES, ttl=TTL, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()  # 最近使用的在末尾
+        self.by_plate = {}
+        self.size = 0
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None and entry.expires <= self.clock():
+            self._remove(key)
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def put(self, key, value, plates, version=None):
+        # plates 为结果中出现的车牌（plateNumber），version 为查询开始前读到的 self.version
+        if version is not None and version != self.version:
+            return False
+        size = len(key) + len(json.dumps(value, separators=(',', ':')))
+        if size > self.max_bytes:
+            return False
+        if key in self.entries:
+            self._remove(key)
+        plates = frozenset(plates)
+        self.entries[key] = CacheEntry(value, plates, size, self.clock() + self.ttl)
+        self.size += size
+        for plate in plates:
+            self.by_plate.setdefault(plate, set()).add(key)
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+        return True
+
+    def invalidate(self, plates):
+        # 返回失效的条目数
+        self.version += 1
+        keys = set()
+        for plate in plates:
+            keys |= self.by_plate.get(plate, set())
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self):
+        self.version += 1
+        self.entries.clear()
+        self.by_plate.clear()
+        self.size = 0
+
+    def stats(self):
+        return {"entries": len(self.entries), "bytes": self.size, "hits": self.hits, "misses": self.misses}
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        self.size -= entry.size
+        for plate in entry.plates:
+            keys = self.by_plate[plate]
+            keys.discard(key)
+            if not keys:
+                del self.by_plate[plate]
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# python_code 里的模块按同级模块互相导入（from confusion_model import ...），
+# generate_data 下的模块统一从这里取用它们：搜索路径只设置一次，每个模块也只以一个名字加载一次
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "python_code"))
+
+import display_sim  # noqa: E402
+from confusion_model import CHAR_FILTER_MAPPINGS, CLASS_THRESHOLD, SIMILAR_CHARS  # noqa: E402
+from fuzzy import mixed_similarity, top_k_mixed  # noqa: E402
@@ -0,0 +1,340 @@
+import argparse
+import asyncio
+import json
+import aiohttp
+from aiohttp import web
+from bulk_writer import ES_BASE_URL
+from plate_blocks import plate_document
+from plate_formats import FORMATS
+from plate_patterns import CompiledPattern
+from result_cache import MAX_BYTES, TTL, ResultCache, query_key
+import word_plates
+
+POOL_SIZE = 32  # 到 ES 的长连接数上限，所有请求共用
+ES_TIMEOUT = 2.0  # 单次 ES 请求的超时（秒）
+DEFAULT_SIZE = 20
+MAX_SIZE = 100
+PRICE_FIELDS = ("price", "discountPercentage", "isAvailable")  # 导入后可能被修改的字段，直接路径上从 ES 取当前值
+CORS_ORIGIN = "*"  # 开发时前端由 vite 在另一个端口提供
+
+# 格式名 -> 前端结果中的分组名
+UI_SECTIONS = {"prefix": "prefix", "current": "newStyle", "suffix": "suffix"}
+
+class SearchError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def keyword_query(keyword, size):
+    # 完全相同的车牌最靠前，其次是前缀相同的，再其次是形近 n 元组命中的。
+    # keyword 须已经过 query_key 规范化：分析器不转小写，三个子句和缓存键必须用同一个字符串
+    return {
+        "size": size,
+        "_source": ["plateNumber", "originalNumber", "plateType", "price"],
+        "query": {
+            "bool": {
+                "should": [
+                    {"term": {"originalNumber": {"value": keyword, "boost": 10}}},
+                    {"prefix": {"originalNumber": {"value": keyword, "boost": 3}}},
+                    {"match": {"plateNumber": keyword}},
+                ],
+                "minimum_should_match": 1,
+            }
+        },
+    }
+
+
+def format_price(price):
+    return f"£{price:,.0f}" if float(price).is_integer() else f"£{price:,.2f}"
+
+
+def to_ui_item(source):
+    # 与前端 sampleData 的条目一致：{plate, price, type}，type 为数字位数，如 "2num"
+    digits = sum(c.isdigit() for c in source["originalNumber"])
+    return {"plate": source["plateNumber"], "price": format_price(source["price"]), "type": f"{digits}num"}
+
+
+class SearchService:
+    def __init__(self, es_url=ES_BASE_URL, pool_size=POOL_SIZE, timeout=ES_TIMEOUT, cache=None):
+        self.es_url = es_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.cache = ResultCache() if cache is None else cache
+        self.session = None
+
+    async def start(self, app=None):
+        # 一个进程只建一个会话：连接池复用长连接，避免每次查询都重新握手
+        connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+    async def stop(self, app=None):
+        await self.session.close()
+
+    async def post(self, path, body, params, headers=None):
+        try:
+            async with self.session.post(f"{self.es_url}/{path}", data=body.encode(), params=params, headers=headers) as response:
+                if response.status != 200:
+                    raise SearchError(502, f"Elasticsearch returned {response.status}: {await response.text()}")
+                return await response.json()
+        except asyncio.TimeoutError:
+            raise SearchError(504, "Elasticsearch timed out") from None
+        except aiohttp.ClientError as e:
+            raise SearchError(502, f"Elasticsearch unreachable: {e}") from None
+
+    async def msearch(self, searches, with_total=False):
+        # searches 为 [(索引, 查询体), ...]，三个格式合并成一次 _msearch 往返；
+        # with_total 时每项返回 (文档列表, 命中总数)
+        body = ''.join(
+            json.dumps({"index": index}) + '\n' + json.dumps(query) + '\n'
+            for index, query in searches
+        )
+        payload = await self.post("_msearch", body, {
+            "filter_path": "responses.hits.hits._source,responses.hits.total.value,responses.error,responses.status",
+        })
+
+        results = []
+        for (index, _), result in zip(searches, payload.get("responses", [])):
+            if "error" in result and result.get("status") != 404:
+                raise SearchError(502, f"search on {index} failed: {result['error']}")
+            # 尚未导入的格式（索引不存在）返回空列表
+            hits = result.get("hits", {})
+            sources = [hit["_source"] for hit in hits.get("hits", [])]
+            results.append((sources, hits.get("total", {}).get("value", 0)) if with_total else sources)
+        return results
+
+    async def refresh_documents(self, entries):
+        # entries 为 [(索引, 生成的文档), ...]。生成的文档里价格、可售状态是导入时的值，
+        # 可能已被 /api/plates 改过：一次 _mget 取回当前值覆盖上去，ES 中没有的文档（或索引）保留生成值
+        if not entries:
+            return
+        body = json.dumps({"docs": [
+            {"_index": index, "_id": document["plateNumber"], "_source": list(PRICE_FIELDS)}
+            for index, document in entries
+        ]})
+        payload = await self.post("_mget", body, {"filter_path": "docs.found,docs._source"},
+                                  headers={"Content-Type": "application/json"})
+        for (_, document), result in zip(entries, payload.get("docs", [])):
+            if result.get("found"):
+                document.update(result["_source"])
+
+    async def keyword_search(self, keyword, size=DEFAULT_SIZE, formats=tuple(UI_SECTIONS)):
+        keyword = query_key(keyword)
+        key = f"{','.join(formats)}/{size}/{keyword}"
+        hits = self.cache.get(key)
+        if hits is None:
+            version = self.cache.version
+            hits = await self.msearch([(name, keyword_query(keyword, size)) for name in formats])
+            self.cache.put(key, hits, (source["plateNumber"] for sources in hits for source in sources), version)
+        response = dict.fromkeys(UI_SECTIONS.values(), [])
+        for name, sources in zip(formats, hits):
+            response[UI_SECTIONS[name]] = [to_ui_item(source) for source in sources]
+        return response
+
+    async def update_plates(self, name, updates):
+        # updates 为 {plateNumber: {"price": ..., "isAvailable": ...}}。等 ES 刷新后再失效缓存，
+        # 之后的查询一定能读到新值；更新期间已发出的查询因 version 变化不会把旧结果写回缓存
+        body = ''.join(
+            json.dumps({"update": {"_index": name, "_id": plate}}) + '\n' + json.dumps({"doc": doc}) + '\n'
+            for plate, doc in updates.items()
+        )
+        try:
+            result = await self.post("_bulk", body, {"refresh": "wait_for", "filter_path": "errors,items.*.error"})
+        finally:
+            invalidated = self.cache.invalidate(updates)
+        if result.get("errors"):
+            errors = [error for item in result["items"] for action in item.values() if (error := action.get("error"))]
+            raise SearchError(502, f"{len(errors)} of {len(updates)} updates failed: {errors[0]}")
+        return {"updated": len(updates), "invalidated": invalidated}
+
+    async def pattern_search(self, name, pattern, size=DEFAULT_SIZE, page=0, min_price=None, max_price=None, available=None):
+        # 键空间是完全组合的：不带过滤条件时匹配数和分页都由序号直接算出，只用一次 _mget 取回这一页的当前价格；
+        # 价格、可售状态可能已在 ES 中更新，带这些过滤条件时才在 ES 中搜索。
+        # 两条路径的分页顺序不同：直接路径按序号，ES 路径按 originalNumber 字符串
+        try:
+            compiled = CompiledPattern(FORMATS[name], pattern)
+        except ValueError as e:
+            raise SearchError(400, str(e)) from None
+        if min_price is None and max_price is None and available is None:
+            total = compiled.count
+            sources = compiled.documents(page, size)
+            await self.refresh_documents([(name, source) for source in sources])
+        else:
+            query = compiled.es_query(page, size, min_price, max_price, available)
+            [(sources, total)] = await self.msearch([(name, query)], with_total=True)
+        response = dict.fromkeys(UI_SECTIONS.values(), [])
+        response[UI_SECTIONS[name]] = [to_ui_item(source) for source in sources]
+        response["total"] = total
+        response["page"] = page
+        return response
+
+
+    async def word_search(self, word, size=DEFAULT_SIZE):
+        # 由单词直接生成各格式的拼法并排序，代价只与单词长度有关，不在 ES 中搜索；
+        # 与 pattern_search 的直接路径一样，只用一次 _mget 取回当前价格。打分是纯 CPU 计算，放到线程池里做
+        layouts = [FORMATS[name] for name in UI_SECTIONS]
+        results = await asyncio.get_running_loop().run_in_executor(None, word_plates.search, word, size, layouts)
+        entries = [
+            (layout.name, plate_document(layout, ordinal, *layout.parts(ordinal)))
+            for (layout, ordinal, _), score in results
+        ]
+        await self.refresh_documents(entries)
+        response = {section: [] for section in UI_SECTIONS.values()}
+        for name, document in entries:
+            response[UI_SECTIONS[name]].append(to_ui_item(document))
+        return response
+
+
+def _size(value):
+    try:
+        size = int(value or DEFAULT_SIZE)
+    except (TypeError, ValueError):
+        raise SearchError(400, "size must be an integer") from None
+    return max(1, min(size, MAX_SIZE))
+
+
+def _page(value):
+    try:
+        return max(0, int(value or 0))
+    except (TypeError, ValueError):
+        raise SearchError(400, "page must be an integer") from None
+
+
+def _price(value):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise SearchError(400, "prices must be numbers") from None
+
+
+def _format(name):
+    if name not in UI_SECTIONS or name not in FORMATS:
+        raise SearchError(400, f"unknown plate format {name!r}; choose from {', '.join(UI_SECTIONS)}")
+    return name
+
+
+async def handle_keyword(request):
+    keyword = request.query.get("q", "").strip()
+    if not keyword:
+        raise SearchError(400, "q is required")
+    service = request.app["service"]
+    return web.json_response(await service.keyword_search(keyword, _size(request.query.get("size"))))
+
+
+async def handle_spell(request):
+    word = request.query.get("q", "").strip()
+    if not word:
+        raise SearchError(400, "q is required")
+    service = request.app["service"]
+    return web.json_response(await service.word_search(word, _size(request.query.get("size"))))
+
+
+async def handle_pattern(request):
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        raise SearchError(400, "body must be JSON") from None
+    if not isinstance(body, dict):
+        raise SearchError(400, "body must be a JSON object")
+    name = _format(body.get("format"))
+    pattern = body.get("pattern")
+    if not isinstance(pattern, list):
+        raise SearchError(400, "pattern must be a list of slot values")
+    available = body.get("available")
+    if available not in (None, True, False):
+        raise SearchError(400, "available must be true or false")
+    service = request.app["service"]
+    return web.json_response(await service.pattern_search(
+        name, pattern, _size(body.get("size")), _page(body.get("page")),
+        _price(body.get("minPrice")), _price(body.get("maxPrice")), available,
+    ))
+
+
+async def handle_update(request):
+    try:
+        body = await request.json()
+    except json.JSONDecodeError:
+        raise SearchError(400, "body must be JSON") from None
+    if not isinstance(body, dict):
+        raise SearchError(400, "body must be a JSON object")
+    name = _format(body.get("format"))
+    items = body.get("updates")
+    if not isinstance(items, list) or not items:
+        raise SearchError(400, "updates must be a non-empty list")
+    updates = {}
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("plate"), str):
+            raise SearchError(400, "each update needs a plate")
+        doc = {}
+        if "price" in item:
+            doc["price"] = _price(item["price"])
+        if "isAvailable" in item:
+            if item["isAvailable"] not in (True, False):
+                raise SearchError(400, "isAvailable must be true or false")
+            doc["isAvailable"] = item["isAvailable"]
+        if not doc:
+            raise SearchError(400, f"update for {item['plate']!r} changes neither price nor isAvailable")
+        updates.setdefault(item["plate"], {}).update(doc)
+    service = request.app["service"]
+    return web.json_response(await service.update_plates(name, updates))
+
+
+async def handle_health(request):
+    return web.json_response({"status": "ok", "cache": request.app["service"].cache.stats()})
+
+
+@web.middleware
+async def error_middleware(request, handler):
+    if request.method == "OPTIONS":
+        response = web.Response()  # CORS 预检
+    else:
+        try:
+            response = await handler(request)
+        except SearchError as e:
+            response = web.json_response({"error": str(e)}, status=e.status)
+    response.headers["Access-Control-Allow-Origin"] = CORS_ORIGIN
+    response.headers["Access-Control-Allow-Headers"] = "Content-Type"
+    response.headers["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
+    return response
+
+
+def make_app(es_url=ES_BASE_URL, pool_size=POOL_SIZE, timeout=ES_TIMEOUT, cache_bytes=MAX_BYTES, cache_ttl=TTL):
+    service = SearchService(es_url, pool_size, timeout, ResultCache(cache_bytes, cache_ttl))
+    app = web.Application(middlewares=[error_middleware])
+    app["service"] = service
+    app.on_startup.append(service.start)
+    app.on_cleanup.append(service.stop)
+    app.router.add_get("/api/search", handle_keyword)
+    app.router.add_get("/api/spell", handle_spell)
+    app.router.add_post("/api/pattern", handle_pattern)
+    app.router.add_post("/api/plates", handle_update)
+    app.router.add_get("/health", handle_health)
+    return app
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP search API for the number plate frontend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--es-url", default=ES_BASE_URL)
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE)
+    parser.add_argument("--timeout", type=float, default=ES_TIMEOUT, help="per-request Elasticsearch timeout in seconds")
+    parser.add_argument("--cache-mb", type=float, default=MAX_BYTES / 1024 / 1024, help="result cache size limit in MiB (0 disables it)")
+    parser.add_argument("--cache-ttl", type=float, default=TTL, help="seconds a cached result stays valid")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app = make_app(args.es_url, args.pool_size, args.timeout, int(args.cache_mb * 1024 * 1024), args.cache_ttl)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
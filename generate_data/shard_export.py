@@ -0,0 +1,221 @@
+import argparse
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from bulk_writer import ES_BASE_URL, BulkWriter, BulkPipeline, create_session
+from checkpoint import load_cache, save_cache
+from index_config import check_and_create_index, create_load_index, finish_load, index_config, versioned_index
+from plate_blocks import iter_blocks, render_bulk_body
+from plate_formats import FORMATS, get_format
+from pricing import PRICING_SEED
+
+SHARD_DOCS = 1_000_000  # 每个分片的文档数（固定，最后一片可能不足）
+BODY_BYTES = 8 << 20  # 重放时每个 _bulk 请求体的目标大小（8MB）
+READ_BYTES = 4 << 20  # 解压时每次读取的字节数
+GZIP_LEVEL = 3  # 压缩级别越低导出越快，分片略大
+MANIFEST = "manifest.json"
+
+# 分片中每条文档前都有一行动作行，请求体只在动作行之前切开，无需解析 JSON
+_ACTION_PREFIXES = (b'\n{"index":', b'\n{"create":')
+
+
+def shard_name(name, i, compress=True):
+    return f"{name}-{i:05d}.ndjson" + (".gz" if compress else "")
+
+
+def _gzip_open(path, mode):
+    return gzip.open(path, mode, compresslevel=GZIP_LEVEL)
+
+
+def export_shard(name, out_dir, i, start, stop, seed, compress):
+    # 把 [start, stop) 渲染成 _bulk 格式写入一个分片，返回写入清单的条目
+    layout = get_format(name)
+    path = os.path.join(out_dir, shard_name(name, i, compress))
+    tmp_path = path + ".tmp"
+    digest = hashlib.sha256()
+    opener = _gzip_open if compress else open
+    with opener(tmp_path, 'wb') as f:
+        for block in iter_blocks(layout, start, stop, seed=seed):
+            body = render_bulk_body(layout, block)
+            digest.update(body)
+            f.write(body)
+    os.replace(tmp_path, path)
+    return {
+        "file": os.path.basename(path),
+        "start": start,
+        "stop": stop,
+        "docs": stop - start,
+        "bytes": os.path.getsize(path),
+        "sha256": digest.hexdigest(),  # 未压缩内容的摘要
+    }
+
+
+def export_format(name, out_dir, docs_per_shard=SHARD_DOCS, seed=PRICING_SEED, compress=True, workers=1):
+    # 分片已写入清单的直接跳过，中断后重新运行只补齐缺失的分片
+    layout = get_format(name)
+    out_dir = os.path.join(out_dir, name)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    manifest = load_cache(manifest_path) or {
+        "format": name,
+        "seed": seed,
+        "docs_per_shard": docs_per_shard,
+        "compression": "gzip" if compress else None,
+        "total_docs": layout.size,
+        "shards": {},
+    }
+    if (manifest["seed"], manifest["docs_per_shard"], manifest["compression"]) != (seed, docs_per_shard, "gzip" if compress else None):
+        raise ValueError(f"{manifest_path} was written with different seed/shard size/compression")
+
+    pending = [
+        (i, start, min(start + docs_per_shard, layout.size))
+        for i, start in enumerate(range(0, layout.size, docs_per_shard))
+        if str(i) not in manifest["shards"]
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(export_shard, name, out_dir, i, start, stop, seed, compress): i
+            for i, start, stop in pending
+        }
+        for future in futures:
+            manifest["shards"][str(futures[future])] = future.result()
+            save_cache(manifest, manifest_path)
+            print(f"[{name}] {len(manifest['shards'])} shards exported")
+    return manifest_path
+
+
+def iter_bodies(path, body_bytes=BODY_BYTES):
+    # 未压缩的分片直接内存映射，按字节切片，不拷贝整份文件
+    if path.endswith(".gz"):
+        yield from _iter_gzip_bodies(path, body_bytes)
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = 0
+        while pos < len(mm):
+            cut = _next_cut(mm, pos + body_bytes)
+            yield mm[pos:cut]
+            pos = cut
+
+
+def _iter_gzip_bodies(path, body_bytes):
+    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    buf = bytearray()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_BYTES)
+            if chunk:
+                buf += decompressor.decompress(chunk)
+            else:
+                buf += decompressor.flush()
+            while len(buf) > body_bytes:
+                cut = _next_cut(buf, body_bytes)
+                if cut == len(buf) and chunk:
+                    break  # 还没读到下一条动作行，继续解压
+                yield bytes(buf[:cut])
+                del buf[:cut]
+            if not chunk:
+                break
+    if buf:
+        yield bytes(buf)
+
+
+def _next_cut(data, pos):
+    # 从 pos 开始找下一条动作行的行首，找不到则切到末尾
+    if pos >= len(data):
+        return len(data)
+    cuts = [data.find(prefix, pos - 1) for prefix in _ACTION_PREFIXES]
+    cuts = [cut for cut in cuts if cut != -1]
+    return min(cuts) + 1 if cuts else len(data)
+
+
+def replay(manifest_path, index=None, es_url=ES_BASE_URL, concurrency=4, queue_size=None, body_bytes=BODY_BYTES,
+           load_version=None, replace_index=False, phonetic=True):
+    # 把分片原样送入 _bulk；检查点记录已完整写入的分片，中断后从下一个分片继续
+    with open(manifest_path, 'r') as f:
+        manifest = json.load(f)
+    alias = index or manifest["format"]
+    # 导入模式写入 <别名>_<版本> 新索引，完成后再切换别名
+    index = versioned_index(alias, load_version) if load_version else alias
+    shard_dir = os.path.dirname(manifest_path)
+    checkpoint_path = os.path.join(shard_dir, f"replay_{index}.json")
+    done = set((load_cache(checkpoint_path) or {}).get("shards", []))
+
+    session = create_session(concurrency)
+    writer = BulkWriter(index, es_url=es_url, session=session)
+    config = index_config(phonetic)
+    if load_version:
+        create_load_index(session, writer.index_url, config)
+    else:
+        check_and_create_index(session, writer.index_url, config)
+
+    submitted = []  # 本次送出的分片，按提交顺序（即分片号升序）
+
+    def on_checkpoint(shard):
+        # 流水线只回调连续完成的最后一个检查点：提交在它之前的分片此时也都已写入
+        done.update(key for key in submitted if key <= shard)
+        save_cache({"shards": sorted(done)}, checkpoint_path)
+
+    with writer, BulkPipeline(writer, concurrency, queue_size, on_checkpoint=on_checkpoint, encoder=bytes) as pipeline:
+        for key, shard in sorted(manifest["shards"].items(), key=lambda item: int(item[0])):
+            if int(key) in done:
+                continue
+            submitted.append(int(key))
+            bodies = iter_bodies(os.path.join(shard_dir, shard["file"]), body_bytes)
+            body = next(bodies, None)
+            while body is not None:
+                next_body = next(bodies, None)
+                # 只有分片的最后一个请求体带检查点
+                pipeline.submit(body, int(key) if next_body is None else None)
+                body = next_body
+    print(f"[{index}] replayed {len(done)}/{len(manifest['shards'])} shards from {shard_dir}")
+
+    if load_version:
+        with create_session() as admin_session:
+            finish_load(admin_session, es_url, index, alias, replace_concrete_index=replace_index)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Export plates to NDJSON shards or replay shards into Elasticsearch")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="write compressed _bulk-ready shards and a manifest")
+    export.add_argument("formats", nargs="*", default=["all"], help=f"plate formats: {', '.join(FORMATS)} or all")
+    export.add_argument("--out", default="./shards", help="output directory")
+    export.add_argument("--docs-per-shard", type=int, default=SHARD_DOCS)
+    export.add_argument("--seed", type=int, default=PRICING_SEED)
+    export.add_argument("--no-compress", action="store_true", help="write plain .ndjson shards (replayed via mmap)")
+    export.add_argument("--workers", type=int, default=1, help="number of processes rendering shards")
+
+    load = sub.add_parser("replay", help="stream shards from a manifest into _bulk")
+    load.add_argument("manifest")
+    load.add_argument("--index", default=None, help="target index (defaults to the manifest's format)")
+    load.add_argument("--es-url", default=ES_BASE_URL)
+    load.add_argument("--concurrency", type=int, default=4)
+    load.add_argument("--queue-size", type=int, default=None)
+    load.add_argument("--body-bytes", type=int, default=BODY_BYTES)
+    load.add_argument("--load-version", default=None, help="load into <index>_<version> with refresh off, then swap the <index> alias")
+    load.add_argument("--replace-index", action="store_true", help="delete a concrete index named like the alias during the swap")
+    load.add_argument("--no-phonetic", action="store_true", help="create the index without the plateNumber.phonetic sub-field")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "export":
+        names = list(FORMATS) if "all" in args.formats else args.formats
+        for name in names:
+            manifest_path = export_format(name, args.out, args.docs_per_shard, args.seed, not args.no_compress, args.workers)
+            print(f"[{name}] manifest written to {manifest_path}")
+    else:
+        replay(
+            args.manifest, args.index, args.es_url, args.concurrency, args.queue_size, args.body_bytes,
+            args.load_version, args.replace_index, not args.no_phonetic,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import heapq
+import time
+from plate_formats import FORMATS, get_format
+from plate_patterns import ABSENT, ANY, DIGIT, CompiledPattern
+from scoring import CLASS_THRESHOLD, SIMILAR_CHARS, top_k_mixed
+
+# 拼写代价：形近替换为 1 - 相似度，完全相同为 0；不参与拼写的位置是通配的填充位。
+# 数字位本来就是车牌的一部分，用作填充比多出一个字母便宜得多
+FILLER_DIGIT_COST = 0.25
+FILLER_LETTER_COST = 1.0
+MAX_COST = 3.0
+PER_PATTERN = 20  # 每个拼写方案最多取出的车牌数（填充位越多，同一方案匹配的车牌越多）
+MAX_CANDIDATES = 1000
+
+
+def _shapes(layout):
+    # 一个格式的各种数字位数对应一种槽位序列，L 为字母位、D 为数字位
+    lengths = sorted({len(str(number)) for number in layout.numbers})
+    return [(length, "L" * layout.head_len + "D" * length + "L" * layout.tail_len) for length in lengths]
+
+
+def _pattern(layout, length, values):
+    # 槽位序列上的取值 -> plate_patterns 的模式（数字左对齐，多出的数字位为 ABSENT）
+    head_end = layout.head_len + length
+    return values[:head_end] + (ABSENT,) * (layout.number_len - length) + values[head_end:]
+
+
+def spellings(word, layouts=None, max_cost=MAX_COST, threshold=CLASS_THRESHOLD):
+    # 按代价从小到大产出 (代价, 格式, CompiledPattern)：把单词逐字符按顺序放进各格式的槽位，
+    # 每个槽位要么拼出下一个字符（原字符或形近字符），要么作为填充位。
+    # 代价非负，一条路径出堆时已是同一模式的最小代价；只产出键空间中确实存在车牌的模式
+    word = ''.join(c for c in word.upper() if c in SIMILAR_CHARS)
+    if not word:
+        return
+    layouts = list(FORMATS.values()) if layouts is None else layouts
+    options = [
+        [(c, 1 - similarity) for c, similarity in SIMILAR_CHARS[w].items() if similarity >= threshold]
+        for w in word
+    ]
+    heap = []
+    n = 0
+    for layout in layouts:
+        for length, slots in _shapes(layout):
+            heap.append((0.0, n, layout, length, slots, 0, ()))
+            n += 1
+    heapq.heapify(heap)
+    seen = set()
+    while heap:
+        cost, _, layout, length, slots, j, values = heapq.heappop(heap)
+        i = len(values)
+        if i == len(slots):
+            key = (layout.name, values)
+            if key in seen:
+                continue
+            seen.add(key)
+            compiled = CompiledPattern(layout, _pattern(layout, length, values))
+            if compiled.count:
+                yield cost, layout, compiled
+            continue
+        letter = slots[i] == "L"
+        if len(slots) - i > len(word) - j:
+            filler = cost + (FILLER_LETTER_COST if letter else FILLER_DIGIT_COST)
+            if filler <= max_cost:
+                heapq.heappush(heap, (filler, n, layout, length, slots, j, values + (ANY if letter else DIGIT,)))
+                n += 1
+        if j < len(word):
+            for c, sub_cost in options[j]:
+                if c.isalpha() == letter and cost + sub_cost <= max_cost:
+                    heapq.heappush(heap, (cost + sub_cost, n, layout, length, slots, j + 1, values + (c,)))
+                    n += 1
+
+
+def candidates(word, layouts=None, max_cost=MAX_COST, per_pattern=PER_PATTERN, max_candidates=MAX_CANDIDATES):
+    # 按拼写代价的顺序产出 (格式, 序号, 车牌)，总数不超过 max_candidates；
+    # 带填充位的模式会覆盖更具体的模式，同一车牌只在代价最小的那次产出
+    seen = set()
+    for _, layout, compiled in spellings(word, layouts, max_cost):
+        for ordinal in compiled.page(0, per_pattern):
+            if (layout.name, ordinal) in seen:
+                continue
+            seen.add((layout.name, ordinal))
+            yield layout, ordinal, layout.plate_number(*layout.parts(ordinal))
+            if len(seen) >= max_candidates:
+                return
+
+
+def search(word, k=20, layouts=None, max_cost=MAX_COST, per_pattern=PER_PATTERN, max_candidates=MAX_CANDIDATES,
+           alpha=0.5, beta=0.5, similarity_threshold=0.5, max_dist=3):
+    # 生成的候选再用 13.py 的混合相似度取前 k 名，返回 [((格式, 序号, 车牌), 分数), ...]。
+    # 与 keyword_query 一样比较去掉空格后的字符串；同分时拼写代价小的在前。
+    # 距离超过 max_dist 的候选得 0 分，top_k_mixed 会用它们补足 k 个，这里去掉，不当作匹配返回。
+    # 最短的车牌也有 5 个字符，单个字母的单词与任何车牌的距离都至少为 4，因此总是没有结果
+    query = word.replace(' ', '').upper()
+    results = top_k_mixed(
+        query,
+        ((candidate, candidate[2].replace(' ', '')) for candidate in candidates(word, layouts, max_cost, per_pattern, max_candidates)),
+        k, alpha, beta, similarity_threshold, max_dist,
+    )
+    return [(candidate, score) for candidate, score in results if score > 0]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Spell words as existing plates without scanning an index")
+    parser.add_argument("words", nargs="+")
+    parser.add_argument("--formats", nargs="*", default=None, help=f"plate formats to spell into: {', '.join(FORMATS)} (default all)")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--max-cost", type=float, default=MAX_COST)
+    parser.add_argument("--per-pattern", type=int, default=PER_PATTERN)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    layouts = [get_format(name) for name in args.formats] if args.formats else None
+    for word in args.words:
+        started = time.perf_counter()
+        results = search(word, args.k, layouts, args.max_cost, args.per_pattern)
+        print(f"{word}: {len(results)} results in {(time.perf_counter() - started) * 1000:.2f}ms")
+        for (layout, _, plate), score in results:
+            print(f"  {plate:<9} {layout.name:<8} {score:.4f}")
+
+
+if __name__ == "__main__":
+    main()
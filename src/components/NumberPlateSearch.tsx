@@ -44,34 +44,76 @@ const sampleData = {
     ]
 };
 
+// 搜索服务地址（generate_data/search_service.py），可通过 VITE_SEARCH_API_URL 覆盖
+const SEARCH_API_URL = import.meta.env.VITE_SEARCH_API_URL ?? 'http://127.0.0.1:8080';
+
+type PlateResult = { plate: string, price: string, type: string };
+type SearchResults = { prefix: PlateResult[], newStyle: PlateResult[], suffix: PlateResult[] };
+type Section = keyof SearchResults;
+
+// 各分组对应的后端格式名和 7 个槽位的类型（L 字母位、N 数字位）
+const FORMATS: Record<Section, { format: string, slots: string }> = {
+    prefix: { format: 'prefix', slots: 'LNNNLLL' },
+    newStyle: { format: 'current', slots: 'LLNNLLL' },
+    suffix: { format: 'suffix', slots: 'LLLNNNL' }
+};
+
 const NumberPlateSearch: React.FC = () => {
     const [prefixPattern, setPrefixPattern] = useState<string[]>(new Array(7).fill(''));
     const [newStylePattern, setNewStylePattern] = useState<string[]>(new Array(7).fill(''));
     const [suffixPattern, setSuffixPattern] = useState<string[]>(new Array(7).fill(''));
     const [keyword, setKeyword] = useState<string>('');
-    const [searchResults, setSearchResults] = useState({
+    const [searchResults, setSearchResults] = useState<SearchResults>({
         prefix: sampleData.prefix,
         newStyle: sampleData.newStyle,
         suffix: sampleData.suffix
     });
 
-    const handleSearch = (e: React.ChangeEvent<HTMLSelectElement>, index: number, setPattern: React.Dispatch<React.SetStateAction<string[]>>) => {
-        const newPattern = [...prefixPattern];
+    const handleSearch = (e: React.ChangeEvent<HTMLSelectElement>, index: number, pattern: string[], setPattern: React.Dispatch<React.SetStateAction<string[]>>) => {
+        const newPattern = [...pattern];
         newPattern[index] = e.target.value;
         setPattern(newPattern);
     };
 
-    const handleKeywordSearch = (keyword: string) => {
+    const handlePatternSearch = async (section: Section, pattern: string[]) => {
+        try {
+            const response = await fetch(`${SEARCH_API_URL}/api/pattern`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ format: FORMATS[section].format, pattern })
+            });
+            if (!response.ok) {
+                throw new Error(`pattern search failed: ${response.status}`);
+            }
+            const results = await response.json();
+            setSearchResults(previous => ({ ...previous, [section]: results[section] }));
+        } catch (error) {
+            console.error(error);
+        }
+    };
+
+    const handleKeywordSearch = async (keyword: string) => {
         setKeyword(keyword);
-        const filteredResults = {
-            prefix: sampleData.prefix.filter(item => item.plate.includes(keyword.toUpperCase())),
-            newStyle: sampleData.newStyle.filter(item => item.plate.includes(keyword.toUpperCase())),
-            suffix: sampleData.suffix.filter(item => item.plate.includes(keyword.toUpperCase()))
-        };
-        setSearchResults(filteredResults);
+        try {
+            const response = await fetch(`${SEARCH_API_URL}/api/search?q=${encodeURIComponent(keyword)}`);
+            if (!response.ok) {
+                throw new Error(`search failed: ${response.status}`);
+            }
+            setSearchResults(await response.json());
+        } catch (error) {
+            // 搜索服务不可用时退回到本地示例数据
+            console.error(error);
+            const filteredResults = {
+                prefix: sampleData.prefix.filter(item => item.plate.includes(keyword.toUpperCase())),
+                newStyle: sampleData.newStyle.filter(item => item.plate.includes(keyword.toUpperCase())),
+                suffix: sampleData.suffix.filter(item => item.plate.includes(keyword.toUpperCase()))
+            };
+            setSearchResults(filteredResults);
+        }
     };
 
-    const renderThreeColumnsInBox = (title: string, data: { plate: string, price: string, type: string }[]) => {
+    const renderThreeColumnsInBox = (title: string, section: Section, pattern: string[], setPattern: React.Dispatch<React.SetStateAction<string[]>>) => {
+        const data = searchResults[section];
         const columns = ['1num', '2num', '3num'].map(type => data.filter(item => item.type === type));
         const hasData = columns.map(column => column.length > 0);
 
@@ -81,8 +123,10 @@ const NumberPlateSearch: React.FC = () => {
                 <SearchModule
                     title={`${title} Search`}
                     description={`Search by specific characters in ${title.toLowerCase()}.`}
-                    pattern={prefixPattern}
-                    onSearch={(e, index) => handleSearch(e, index, setPrefixPattern)}
+                    pattern={pattern}
+                    slots={FORMATS[section].slots}
+                    onSearch={(e, index) => handleSearch(e, index, pattern, setPattern)}
+                    onSubmit={() => handlePatternSearch(section, pattern)}
                 />
                 <div className="results-three-column">
                     {columns.map((column, index) => hasData[index] && (
@@ -105,9 +149,9 @@ const NumberPlateSearch: React.FC = () => {
         <div className="number-plate-search">
             <KeywordSearch onSearch={handleKeywordSearch} />
             <div className="search-results">
-                {renderThreeColumnsInBox('Prefix Style', searchResults.prefix)}
-                {renderThreeColumnsInBox('New Style', searchResults.newStyle)}
-                {renderThreeColumnsInBox('Suffix Style', searchResults.suffix)}
+                {renderThreeColumnsInBox('Prefix Style', 'prefix', prefixPattern, setPrefixPattern)}
+                {renderThreeColumnsInBox('New Style', 'newStyle', newStylePattern, setNewStylePattern)}
+                {renderThreeColumnsInBox('Suffix Style', 'suffix', suffixPattern, setSuffixPattern)}
             </div>
             <div className="bottom-filler"></div>
         </div>
@@ -5,9 +5,11 @@ interface SearchModuleProps {
     description: string;
     pattern: string[];
     onSearch: (e: React.ChangeEvent<HTMLSelectElement>, index: number) => void;
+    onSubmit?: () => void;
+    slots?: string; // 每个下拉框是字母位(L)还是数字位(N)，与后端 PlateLayout.slots 一致
 }
 
-const SearchModule: React.FC<SearchModuleProps> = ({ title, description, pattern, onSearch }) => {
+const SearchModule: React.FC<SearchModuleProps> = ({ title, description, pattern, onSearch, onSubmit, slots = 'LNNNLLL' }) => {
     const letters = ['', '*', ...'ABCDEFGHIJKLMNOPQRSTUVWXYZ'];
     const numbers = ['', '*', '-', ...'0123456789'];
 
@@ -18,11 +20,7 @@ const SearchModule: React.FC<SearchModuleProps> = ({ title, description, pattern
             <div className="pattern-input">
                 {pattern.map((item, index) => (
                     <select key={index} onChange={(e) => onSearch(e, index)}>
-                        {index === 0 ? letters.map((char) => (
-                            <option key={char} value={char}>
-                                {char}
-                            </option>
-                        )) : (index >= 1 && index <= 3) ? numbers.map((num) => (
+                        {slots[index] === 'N' ? numbers.map((num) => (
                             <option key={num} value={num}>
                                 {num}
                             </option>
@@ -34,7 +32,7 @@ const SearchModule: React.FC<SearchModuleProps> = ({ title, description, pattern
                     </select>
                 ))}
             </div>
-            <button onClick={() => onSearch({} as React.ChangeEvent<HTMLSelectElement>, 0)}>Search</button>
+            <button onClick={() => onSubmit?.()}>Search</button>
         </div>
     );
 };